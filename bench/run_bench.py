@@ -0,0 +1,322 @@
+#!/usr/bin/env python3
+"""
+Offline benchmark for solver.py.
+
+Serves bench/mock_practice.html from a local HTTP server, opens it in a
+Chromium started with remote debugging and runs solver.py against it over
+CDP, the way it runs on its own. The mock page draws its exercises from a fixed
+seed, so two runs with the same flags see the same sequence and can be
+compared. When the page has served --count exercises it switches to the
+standard view, the solver exits and the results are printed.
+
+    python bench/run_bench.py --count 200 --seed 1
+    python bench/run_bench.py --async --push --input-mode fill --json out.json
+"""
+import argparse
+import json
+import os
+import random
+import shutil
+import socket
+import statistics
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from playwright.sync_api import sync_playwright
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+REPO_DIR = os.path.dirname(BENCH_DIR)
+MOCK_PAGE = os.path.join(BENCH_DIR, "mock_practice.html")
+
+EXERCISE_TYPES = [
+    "translateWord", "chooseWord", "oneOutOfMany", "translateFallingWord", "completeWord",
+    "pexeso", "findPair", "choosePicture", "describePicture", "transcribe",
+]
+PICTURE_COUNT = 12
+
+
+def free_port():
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def build_session(args):
+    """Vocabulary and pictures for the mock page plus the files handed to the solver."""
+    rng = random.Random(args.seed)
+    with open(args.wordlist, "r", encoding="utf-8") as f:
+        table = json.load(f)
+
+    vocab = sorted(table.items())
+    # a share of the words is kept from the solver so the auto-learn path runs too
+    unknown = set(rng.sample(range(len(vocab)), int(len(vocab) * args.unknown_share)))
+    solver_table = {q: a for i, (q, a) in enumerate(vocab) if i not in unknown}
+
+    words = sorted({a for _, a in vocab})
+    pictures = [[f"/pictures/{i}.png", word] for i, word in enumerate(rng.sample(words, min(PICTURE_COUNT, len(words))))]
+
+    session = {
+        "seed": args.seed,
+        "count": args.count,
+        "types": args.types,
+        "transition_ms": args.transition_ms,
+        "start_points": 0,
+        "vocab": vocab,
+        "pictures": pictures,
+    }
+    return session, solver_table, dict(pictures)
+
+
+class BenchServer:
+    """Serves the mock page and collects the events it posts back."""
+
+    def __init__(self, session):
+        self.session = session
+        self.events = []
+        self.done = threading.Event()
+        self.lock = threading.Lock()
+
+        bench = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                path = self.path.split("?", 1)[0]
+                if path == "/session.json":
+                    self._send(200, "application/json", json.dumps(bench.session).encode("utf-8"))
+                elif path in ("/", "/practice"):
+                    with open(MOCK_PAGE, "rb") as f:
+                        self._send(200, "text/html; charset=utf-8", f.read())
+                else:
+                    self._send(404, "text/plain", b"not found")
+
+            def do_POST(self):
+                body = self.rfile.read(int(self.headers.get("Content-Length") or 0))
+                if self.path == "/event":
+                    try:
+                        event = json.loads(body)
+                    except ValueError:
+                        event = None
+                    if isinstance(event, dict):
+                        event["at"] = time.monotonic()
+                        with bench.lock:
+                            bench.events.append(event)
+                        if event.get("type") == "done":
+                            bench.done.set()
+                self._send(204, "text/plain", b"")
+
+            def _send(self, status, content_type, body):
+                self.send_response(status)
+                self.send_header("Content-Type", content_type)
+                self.send_header("Content-Length", str(len(body)))
+                self.send_header("Cache-Control", "no-store")
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, *a):
+                pass
+
+        self.httpd = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+        self.port = self.httpd.server_address[1]
+        self.thread = threading.Thread(target=self.httpd.serve_forever, name="bench-http", daemon=True)
+
+    def __enter__(self):
+        self.thread.start()
+        return self
+
+    def __exit__(self, *exc):
+        self.httpd.shutdown()
+        self.httpd.server_close()
+
+
+def solver_env(args, workdir, cdp_port):
+    env = dict(os.environ)
+    env.update({
+        "DEBUG_PORT": str(cdp_port),
+        "WORDLIST_FILE": os.path.join(workdir, "wordlist.json"),
+        "PICTURE_FILE": os.path.join(workdir, "picturelist.json"),
+        "METRICS_FILE": os.path.join(workdir, "metrics.json"),
+        "METRICS_FORMAT": "json",
+        "METRICS_INTERVAL": "1",
+        "HEADLESS": "true",
+        # the mock page ends the run, the points target must never be reached first
+        "ADDON_POINTS": str(10 ** 9),
+        "PUSH_MODE": str(args.push).lower(),
+        "INPUT_MODE": args.input_mode,
+        "CLICK_DELAY_SCALE": str(args.click_delay_scale),
+        "NTFY_SERVER": "",
+        "NTFY_TOPIC": "",
+    })
+    if args.key_delay_ms is not None:
+        env["KEY_DELAY_MS"] = args.key_delay_ms
+    return env
+
+
+def percentile(values, q):
+    if not values:
+        return 0.0
+    values = sorted(values)
+    return values[min(len(values) - 1, int(round(q * (len(values) - 1))))]
+
+
+def summarize(events, metrics, elapsed):
+    exercises = [e for e in events if e["type"] not in ("done", "incorrect")]
+    scored = [e for e in exercises if e["correct"] is not None]
+    correct = sum(1 for e in scored if e["correct"])
+
+    by_type = {}
+    for e in exercises:
+        by_type.setdefault(e["type"], []).append(e)
+
+    # the first exercise is on screen while the solver starts up, so the rate
+    # is taken between the first and the last answer
+    steady = exercises[-1]["at"] - exercises[0]["at"] if len(exercises) > 1 else 0.0
+
+    return {
+        "exercises": len(exercises),
+        "correct": correct,
+        "scored": len(scored),
+        "elapsed_seconds": round(elapsed, 2),
+        "exercises_per_second": round((len(exercises) - 1) / steady, 3) if steady > 0 else 0.0,
+        "types": {
+            name: {
+                "count": len(items),
+                "correct": sum(1 for e in items if e["correct"]),
+                "p50_ms": round(statistics.median(e["ms"] for e in items), 1),
+                "p95_ms": round(percentile([e["ms"] for e in items], 0.95), 1),
+            }
+            for name, items in sorted(by_type.items())
+        },
+        "solver": metrics,
+    }
+
+
+def print_report(args, result):
+    engine = "async" if args.use_async else "sync"
+    print()
+    print(f"seed={args.seed} engine={engine} push={args.push} input={args.input_mode} click_delay_scale={args.click_delay_scale}")
+    rate = f"{100 * result['correct'] / result['scored']:.0f}%" if result["scored"] else "-"
+    print(f"{result['exercises']} exercises in {result['elapsed_seconds']} s (including solver startup), {result['correct']}/{result['scored']} correct ({rate})")
+    print(f"steady state: {result['exercises_per_second']} exercises/s")
+
+    print()
+    print("time on screen per exercise type:")
+    print(f"  {'type':<22}{'count':>7}{'correct':>9}{'p50 ms':>10}{'p95 ms':>10}")
+    for name, t in result["types"].items():
+        print(f"  {name:<22}{t['count']:>7}{t['correct']:>9}{t['p50_ms']:>10}{t['p95_ms']:>10}")
+
+    handlers = (result["solver"] or {}).get("handlers") or {}
+    if handlers:
+        print()
+        print("solver handler latency (from metrics):")
+        print(f"  {'handler':<22}{'count':>7}{'failed':>8}{'avg ms':>10}{'max ms':>10}{'cdp/run':>9}")
+        for name, h in sorted(handlers.items()):
+            print(f"  {name:<22}{h['count']:>7}{h['failed']:>8}{h['avg_ms']:>10}{h['max_ms']:>10}{h['cdp_calls_per_run']:>9}")
+        print(f"  total CDP calls: {result['solver'].get('cdp_calls')}")
+
+    settle = (result["solver"] or {}).get("settle") or {}
+    if settle:
+        print()
+        print("post-answer settle (from metrics):")
+        print(f"  {'exercise':<22}{'timeout ms':>12}{'samples':>9}{'timeouts':>10}")
+        for name, st in sorted(settle.items()):
+            print(f"  {name:<22}{st['timeout_ms']:>12}{st['samples']:>9}{st['timeouts']:>10}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Run solver.py against a local mock practice page")
+    parser.add_argument("--count", type=int, default=100, help="Exercises to serve before the page ends the run")
+    parser.add_argument("--seed", type=int, default=1, help="Seed for the exercise sequence")
+    parser.add_argument("--types", default=",".join(EXERCISE_TYPES), help="Comma separated exercise types to serve")
+    parser.add_argument("--unknown-share", type=float, default=0.1, help="Share of words missing from the solver's wordlist")
+    parser.add_argument("--transition-ms", type=int, default=150, help="Delay between exercises on the mock page")
+    parser.add_argument("--wordlist", default=os.path.join(REPO_DIR, "wordlist.json"), help="Vocabulary the page draws from")
+    parser.add_argument("--async", dest="use_async", action="store_true", help="Run the asyncio solver engine")
+    parser.add_argument("--push", action="store_true", help="Run the solver in push mode")
+    parser.add_argument("--input-mode", choices=["type", "fill"], default="type")
+    parser.add_argument("--key-delay-ms", default=None, help="Passed to the solver as KEY_DELAY_MS")
+    parser.add_argument("--click-delay-scale", type=float, default=1.0)
+    parser.add_argument("--timeout", type=float, default=600, help="Give up after this many seconds")
+    parser.add_argument("--headed", action="store_true", help="Show the browser window")
+    parser.add_argument("--json", dest="json_out", help="Also write the results to this file")
+    args = parser.parse_args()
+
+    args.types = [t.strip() for t in args.types.split(",") if t.strip()]
+    unknown_types = [t for t in args.types if t not in EXERCISE_TYPES]
+    if unknown_types or not args.types:
+        print("Unknown exercise types:", ", ".join(unknown_types) or "(none given)")
+        sys.exit(1)
+
+    session, solver_table, pictures = build_session(args)
+    workdir = tempfile.mkdtemp(prefix="woca-bench-")
+    with open(os.path.join(workdir, "wordlist.json"), "w", encoding="utf-8") as f:
+        json.dump(solver_table, f, ensure_ascii=False, indent=2)
+    with open(os.path.join(workdir, "picturelist.json"), "w", encoding="utf-8") as f:
+        json.dump(pictures, f, ensure_ascii=False, indent=2)
+
+    cdp_port = free_port()
+    try:
+        with BenchServer(session) as server, sync_playwright() as p:
+            url = f"http://127.0.0.1:{server.port}/practice"
+            browser = p.chromium.launch(headless=not args.headed, args=["--no-sandbox", f"--remote-debugging-port={cdp_port}"])
+            page = browser.new_context().new_page()
+            page.goto(url)
+            page.wait_for_selector("#WocaPoints")
+            print("Mock practice page:", url)
+
+            cmd = [sys.executable, os.path.join(REPO_DIR, "solver.py"), "--url", url]
+            if args.use_async:
+                cmd.append("--async")
+            # run from the temp dir so a local config.toml doesn't leak into the run
+            solver = subprocess.Popen(cmd, cwd=workdir, env=solver_env(args, workdir, cdp_port))
+
+            started = time.monotonic()
+            while not server.done.is_set() and solver.poll() is None:
+                if time.monotonic() - started > args.timeout:
+                    print(f"Timed out after {args.timeout:.0f} s")
+                    break
+                # keep the playwright connection serviced while we wait
+                page.wait_for_timeout(200)
+
+            try:
+                solver.wait(timeout=30)
+            except subprocess.TimeoutExpired:
+                solver.kill()
+                solver.wait()
+            browser.close()
+
+        with server.lock:
+            events = list(server.events)
+        exercise_events = [e for e in events if e["type"] not in ("done", "incorrect")]
+        finished = server.done.is_set()
+        end = max((e["at"] for e in events), default=started)
+        elapsed = end - started
+
+        metrics = None
+        metrics_path = os.path.join(workdir, "metrics.json")
+        if os.path.exists(metrics_path):
+            with open(metrics_path, "r", encoding="utf-8") as f:
+                metrics = json.load(f)
+
+        result = summarize(events, metrics, elapsed)
+        result["finished"] = finished
+        result["solver_exit_code"] = solver.returncode
+        print_report(args, result)
+        if not finished:
+            print(f"\nRun did not finish, only {len(exercise_events)} of {args.count} exercises were answered")
+
+        if args.json_out:
+            with open(args.json_out, "w", encoding="utf-8") as f:
+                json.dump(dict(result, config=vars(args)), f, indent=2)
+            print("\nResults written to", args.json_out)
+    finally:
+        shutil.rmtree(workdir, ignore_errors=True)
+
+    sys.exit(0 if finished else 1)
+
+
+if __name__ == "__main__":
+    main()
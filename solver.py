@@ -1,5 +1,7 @@
 #!/usr/bin/env python3
 from playwright.sync_api import sync_playwright
+from playwright.async_api import async_playwright
+import asyncio
 import time
 import random
 import requests
@@ -9,102 +11,422 @@ import os
 import traceback
 import toml
 import argparse
+import collections
+import functools
+import atexit
+import queue
+import threading
+from urllib.parse import urljoin
+
+# ----------------- Config -----------------
+CONFIG_FILE = "config.toml"
+
+# Settings before configure() runs, so a bare import can use the helpers
+URLBASE = "https://wocabee.app/app"
+DEBUG_PORT = "http://127.0.0.1:9222"
+WORDLIST_FILE = "wordlist.json"
+PICTURE_FILE = "picturelist.json"
+addon_points = 0
+milestone_reminder = 1000
+PLACEHOLDER_WORDS = {"", "translate", "check"}
+NTFY_SERVER = NTFY_TOPIC = NTFY_TOKEN = None
+HEADLESS = False
+PUSH_MODE = False
+INPUT_MODE = "type"
+KEY_DELAY_MS = (60, 120)
+CLICK_DELAY_SCALE = 1.0
+METRICS_FILE = None
+METRICS_FORMAT = "json"
+METRICS_INTERVAL = 30.0
+ASYNC_ENGINE = False
+VOCAB_WARMUP = False
+VOCAB_URL = None
+VOCAB_ROW_SELECTOR = VOCAB_QUESTION_SELECTOR = VOCAB_ANSWER_SELECTOR = None
+
+def configure(config_file=CONFIG_FILE, url=None, use_async=False):
+    """
+    Read config.toml and the environment into the module settings below.
+    Environment variables win over the file, `url` wins over both.
+    """
+    global URLBASE, DEBUG_PORT, WORDLIST_FILE, PICTURE_FILE, addon_points, milestone_reminder
+    global PLACEHOLDER_WORDS, NTFY_SERVER, NTFY_TOPIC, NTFY_TOKEN, HEADLESS, PUSH_MODE, INPUT_MODE
+    global KEY_DELAY_MS, CLICK_DELAY_SCALE, METRICS_FILE, METRICS_FORMAT, METRICS_INTERVAL, ASYNC_ENGINE
+    global VOCAB_WARMUP, VOCAB_URL, VOCAB_ROW_SELECTOR, VOCAB_QUESTION_SELECTOR, VOCAB_ANSWER_SELECTOR
+
+    config = toml.load(config_file) if os.path.exists(config_file) else {}
+
+    URLBASE = url or os.environ.get("URLBASE") or config.get("urlbase", "wocabee.app/app")
+    # Ensure URL starts with http:// or https://
+    if not URLBASE.startswith(("http://", "https://")):
+        URLBASE = "https://" + URLBASE
+
+    # CDP debug port/url used to connect to an existing Chromium/Edge instance.  
+    # Before running the bot you must start your browser with something like:
+    #   chrome --remote-debugging-port=9222
+    # or point DEBUG_PORT to a running instance.  The script now normalizes
+    # simple port values and will fall back to launching its own browser when
+    # connection is refused.
+    DEBUG_PORT = os.environ.get("DEBUG_PORT") or config.get("debug_port", "http://127.0.0.1:9222")
+    # some users may just provide a port number (e.g. "9222"), so normalize to a full URL
+    if DEBUG_PORT and DEBUG_PORT.isdigit():
+        DEBUG_PORT = f"http://127.0.0.1:{DEBUG_PORT}"
+
+    WORDLIST_FILE = os.environ.get("WORDLIST_FILE") or config.get("wordlist_file", "wordlist.json")
+    PICTURE_FILE = os.environ.get("PICTURE_FILE") or config.get("picture_file", "picturelist.json")
+
+    addon_points = int(os.environ.get("ADDON_POINTS") or config.get("addon_points", 0))
+    milestone_reminder = int(os.environ.get("MILESTONE_REMINDER") or config.get("milestone_reminder", 1000))
+
+    PLACEHOLDER_WORDS = {
+        w.strip() for w in (
+            os.environ.get("PLACEHOLDER_WORDS")
+            or ",".join(config.get("placeholder_words", ["", "translate", "check"]))
+        ).split(",")
+    }
+    NTFY_SERVER = (os.environ.get("NTFY_SERVER") or config.get("ntfy_server") or "").strip() or None
+    NTFY_TOPIC  = (os.environ.get("NTFY_TOPIC")  or config.get("ntfy_topic")  or "").strip() or None
+    NTFY_TOKEN  = (os.environ.get("NTFY_TOKEN")  or config.get("ntfy_token")  or "").strip() or None
+    HEADLESS    = str(os.environ.get("HEADLESS") or config.get("headless", False)).lower() in ("true", "1", "yes")
+    # Push mode: an in-page MutationObserver reports state changes instead of polling
+    PUSH_MODE   = str(os.environ.get("PUSH_MODE") or config.get("push_mode", False)).lower() in ("true", "1", "yes")
+    # How answers get into text inputs: "type" presses every key, "fill" sets the
+    # value at once and fires the input/keyup/change events the page listens for
+    INPUT_MODE  = (os.environ.get("INPUT_MODE") or config.get("input_mode", "type")).strip().lower()
+    if INPUT_MODE not in ("type", "fill"):
+        print(f"Unknown input_mode '{INPUT_MODE}', falling back to 'type'")
+        INPUT_MODE = "type"
+    # Per-key delay range in ms for "type", a single number means a fixed delay
+    _key_delay = os.environ.get("KEY_DELAY_MS") or config.get("key_delay_ms", [60, 120])
+    if isinstance(_key_delay, str):
+        _key_delay = [int(v) for v in _key_delay.split(",") if v.strip()]
+    elif isinstance(_key_delay, (int, float)):
+        _key_delay = [_key_delay]
+    KEY_DELAY_MS = (min(_key_delay), max(_key_delay)) if _key_delay else (0, 0)
+    # Multiplies every random pause around clicks, 0 turns them off
+    CLICK_DELAY_SCALE = float(os.environ.get("CLICK_DELAY_SCALE") or config.get("click_delay_scale", 1.0))
+    # Metrics export, an empty metrics_file turns writing off
+    METRICS_FILE = (os.environ.get("METRICS_FILE") or config.get("metrics_file") or "").strip() or None
+    METRICS_FORMAT = (os.environ.get("METRICS_FORMAT") or config.get("metrics_format", "json")).strip().lower()
+    METRICS_INTERVAL = float(os.environ.get("METRICS_INTERVAL") or config.get("metrics_interval", 30))
+    ASYNC_ENGINE = bool(use_async) or str(os.environ.get("ASYNC_ENGINE") or config.get("async_engine", False)).lower() in ("true", "1", "yes")
+    # Vocabulary warm-up after the package is opened. The listing's URL and
+    # markup aren't confirmed, so there are no defaults: all four must be set
+    VOCAB_WARMUP = str(os.environ.get("VOCAB_WARMUP") or config.get("vocab_warmup", False)).lower() in ("true", "1", "yes")
+    VOCAB_URL = (os.environ.get("VOCAB_URL") or config.get("vocab_url") or "").strip() or None
+    VOCAB_ROW_SELECTOR = (os.environ.get("VOCAB_ROW_SELECTOR") or config.get("vocab_row_selector") or "").strip() or None
+    VOCAB_QUESTION_SELECTOR = (os.environ.get("VOCAB_QUESTION_SELECTOR") or config.get("vocab_question_selector") or "").strip() or None
+    VOCAB_ANSWER_SELECTOR = (os.environ.get("VOCAB_ANSWER_SELECTOR") or config.get("vocab_answer_selector") or "").strip() or None
+
+    if not URLBASE or not DEBUG_PORT:
+        raise ValueError("URLBASE and DEBUG_PORT must be set via environment variables, config.toml, or CLI arguments.")
 
-# ----------------- CLI -----------------
-parser = argparse.ArgumentParser()
-parser.add_argument("--url", help="Target URL")
-args = parser.parse_args()
-
-# ----------------- Config file -----------------
-config_file = "config.toml"
-config = toml.load(config_file) if os.path.exists(config_file) else {}
-
-# ----------------- Variables -----------------
-URLBASE = args.url or os.environ.get("URLBASE") or config.get("urlbase", "wocabee.app/app")
-# Ensure URL starts with http:// or https://
-if not URLBASE.startswith(("http://", "https://")):
-    URLBASE = "https://" + URLBASE
-
-# CDP debug port/url used to connect to an existing Chromium/Edge instance.  
-# Before running the bot you must start your browser with something like:
-#   chrome --remote-debugging-port=9222
-# or point DEBUG_PORT to a running instance.  The script now normalizes
-# simple port values and will fall back to launching its own browser when
-# connection is refused.
-DEBUG_PORT = os.environ.get("DEBUG_PORT") or config.get("debug_port", "http://127.0.0.1:9222")
-# some users may just provide a port number (e.g. "9222"), so normalize to a full URL
-if DEBUG_PORT and DEBUG_PORT.isdigit():
-    DEBUG_PORT = f"http://127.0.0.1:{DEBUG_PORT}"
-
-WORDLIST_FILE = os.environ.get("WORDLIST_FILE") or config.get("wordlist_file", "wordlist.json")
-PICTURE_FILE = os.environ.get("PICTURE_FILE") or config.get("picture_file", "picturelist.json")
-
-addon_points = int(os.environ.get("ADDON_POINTS") or config.get("addon_points", 0))
-milestone_reminder = int(os.environ.get("MILESTONE_REMINDER") or config.get("milestone_reminder", 1000))
-
-PLACEHOLDER_WORDS = {
-    w.strip() for w in (
-        os.environ.get("PLACEHOLDER_WORDS")
-        or ",".join(config.get("placeholder_words", ["", "translate", "check"]))
-    ).split(",")
-}
-NTFY_SERVER = (os.environ.get("NTFY_SERVER") or config.get("ntfy_server") or "").strip() or None
-NTFY_TOPIC  = (os.environ.get("NTFY_TOPIC")  or config.get("ntfy_topic")  or "").strip() or None
-NTFY_TOKEN  = (os.environ.get("NTFY_TOKEN")  or config.get("ntfy_token")  or "").strip() or None
-HEADLESS    = str(os.environ.get("HEADLESS") or config.get("headless", False)).lower() in ("true", "1", "yes")
+# ----------- NTFY ERROR FUNCTION ------------
+
+def post_ntfy(session, title: str, message: str):
+    try:
+        response = session.post(
+            f"{NTFY_SERVER}/{NTFY_TOPIC}",
+            data=message.encode("utf-8"),
+            headers={"Title": title},
+            timeout=5,
+        )
+        response.raise_for_status()
+    except Exception as e:
+        print("Failed to send NTFY notification:", e)
 
-if not URLBASE or not DEBUG_PORT:
-    print("Error: URLBASE and DEBUG_PORT must be set via environment variables, config.toml, or CLI arguments.")
-    exit(1)
+class NtfyNotifier:
+    """
+    Background ntfy sender. notify() only puts the message on a bounded queue,
+    a worker thread posts it over one pooled session. Messages that arrive
+    within COALESCE_SECONDS of each other are merged per title, and a
+    repeated error is sent at most once per ERROR_COOLDOWN.
+    """
 
-# ----------- NTFY ERROR FUNCTION ------------
+    QUEUE_SIZE = 200
+    COALESCE_SECONDS = 2.0
+    ERROR_COOLDOWN = 300.0
+    # Summary line used when several messages with the same title are merged
+    SUMMARIES = {
+        "Wocabee Bot Auto-Learned": "Learned {count} new words",
+        "Wocabee Bot Progress Report": "{count} milestones reached",
+    }
 
-def notify_ntfy(title: str, message: str):
-    if NTFY_SERVER and NTFY_TOPIC:
+    def __init__(self):
+        self.session = requests.Session()
+        if NTFY_TOKEN:
+            self.session.headers["Authorization"] = f"Bearer {NTFY_TOKEN}"
+        self.queue = queue.Queue(maxsize=self.QUEUE_SIZE)
+        self.errors = {}  # error message -> [last sent, suppressed since]
+        self.thread = threading.Thread(target=self._run, name="ntfy-sender", daemon=True)
+        self.thread.start()
+
+    def notify(self, title: str, message: str):
         try:
-            url = f"{NTFY_SERVER}/{NTFY_TOPIC}"
-            data = message.encode("utf-8")
-            headers = {
-                "Title": title,
-            }
-            if NTFY_TOKEN:
-                headers["Authorization"] = f"Bearer {NTFY_TOKEN}"
-            response = requests.post(url, data=data, headers=headers, timeout=5)
-            response.raise_for_status()
-        except Exception as e:
-            print("Failed to send NTFY notification:", e)
+            self.queue.put_nowait((title, message))
+        except queue.Full:
+            print("NTFY queue full, dropping notification:", title)
+
+    def close(self, timeout=10.0):
+        """Send whatever is still queued and stop the worker."""
+        try:
+            self.queue.put(None, timeout=timeout)
+        except queue.Full:
+            return
+        self.thread.join(timeout)
+
+    def _run(self):
+        running = True
+        while running:
+            item = self.queue.get()
+            if item is None:
+                break
+            batch = [item]
+            # gather the rest of the burst
+            deadline = time.monotonic() + self.COALESCE_SECONDS
+            while True:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                try:
+                    item = self.queue.get(timeout=remaining)
+                except queue.Empty:
+                    break
+                if item is None:
+                    running = False
+                    break
+                batch.append(item)
+            for title, message in self._coalesce(batch):
+                post_ntfy(self.session, title, message)
+        # drain anything queued after the stop marker
+        while True:
+            try:
+                item = self.queue.get_nowait()
+            except queue.Empty:
+                break
+            if item is not None:
+                post_ntfy(self.session, *item)
+
+    def _coalesce(self, batch):
+        grouped = {}
+        for title, message in batch:
+            if "Error" in title and not self._error_allowed(message):
+                continue
+            grouped.setdefault(title, []).append(message)
+
+        for title, messages in grouped.items():
+            if len(messages) == 1:
+                yield title, messages[0]
+                continue
+            summary = self.SUMMARIES.get(title, "{count} notifications").format(count=len(messages))
+            yield title, summary + ":\n" + "\n".join(messages)
+
+    def _error_allowed(self, message: str) -> bool:
+        now = time.monotonic()
+        entry = self.errors.get(message)
+        if entry and now - entry[0] < self.ERROR_COOLDOWN:
+            entry[1] += 1
+            return False
+        if entry and entry[1]:
+            print(f"NTFY: error repeated {entry[1]} times since the last report")
+        self.errors[message] = [now, 0]
+        return True
+
+# started by load_data() when a server and topic are configured
+NOTIFIER = None
+
+def notify_ntfy(title: str, message: str):
+    # never blocks, the notifier thread does the network I/O
+    if NOTIFIER:
+        NOTIFIER.notify(title, message)
 
 # ---------------- LOAD DATA ----------------
 
-notify_ntfy("Wocabee Bot Started", f"The bot has been started and is connecting into the browser, estimated time until finished = {addon_points * 1.75} seconds")
-
-if os.path.exists(WORDLIST_FILE):
-    with open(WORDLIST_FILE, "r", encoding="utf-8") as f:
-        WORD_TABLE = json.load(f)
-else:
-    WORD_TABLE = {
-        "pracovny postup": "technique",
-        "viditelny": "visible",
-        "vazny": "serious",
-        "seriozny": "serious",
-        "vazny, seriozny": "serious",
-        "vedecke laboratorium": "science laboratory",
-        "krok": "step",
-        "vyznam, zmysel": "significance",
-        "burka": "storm",
-    }
-    with open(WORDLIST_FILE, "w", encoding="utf-8") as f:
-        json.dump(WORD_TABLE, f, ensure_ascii=False, indent=2)
+def save_word_table(table):
+    # write a temp file and swap it in, a crash never leaves a truncated list
+    tmp_file = WORDLIST_FILE + ".tmp"
+    with open(tmp_file, "w", encoding="utf-8") as f:
+        json.dump(table, f, ensure_ascii=False, indent=2)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp_file, WORDLIST_FILE)
 
-if os.path.exists(PICTURE_FILE):
-    with open(PICTURE_FILE, "r", encoding="utf-8") as f:
-        PICTURE_MAP = json.load(f)
-else:
-    PICTURE_MAP = {}
+class WordJournal:
+    """
+    Append-only log of learned words next to WORDLIST_FILE. Each new mapping
+    is one JSON line, fsynced in batches. The journal is compacted into the
+    JSON file every COMPACT_SECONDS and at exit, and replayed on load.
+    """
 
-def save_picture_map():
-    with open(PICTURE_FILE, "w", encoding="utf-8") as f:
-        json.dump(PICTURE_MAP, f, ensure_ascii=False, indent=2)
+    SYNC_EVERY = 16         # entries
+    SYNC_SECONDS = 2.0
+    COMPACT_SECONDS = 300.0
+
+    def __init__(self, path: str):
+        self.path = path
+        # journal being folded into the JSON file, kept until the write is done
+        self.rotated_path = path + ".compacting"
+        self.file = None
+        self.pending = 0
+        self.compacting = False
+        self.lock = threading.Lock()
+        self.last_sync = self.last_compact = time.monotonic()
+
+    @staticmethod
+    def _read(path: str, table: dict) -> int:
+        count = 0
+        if not os.path.exists(path):
+            return count
+        with open(path, "r", encoding="utf-8") as f:
+            for line in f:
+                try:
+                    entry = json.loads(line)
+                except json.JSONDecodeError:
+                    continue  # torn line from a crash mid-append
+                table[entry["q"]] = entry["a"]
+                count += 1
+        return count
+
+    def recover(self, table: dict) -> int:
+        """
+        Fold a rotated journal left by a run that crashed mid-compaction into
+        the JSON file. Runs at load, before anything can rotate over it.
+        """
+        if not os.path.exists(self.rotated_path):
+            return 0
+        count = self._read(self.rotated_path, table)
+        save_word_table(table)
+        os.remove(self.rotated_path)
+        return count
+
+    def replay(self, table: dict) -> int:
+        return self._read(self.path, table)
+
+    def append(self, question: str, answer: str):
+        self.append_many([(question, answer)])
+
+    def append_many(self, pairs):
+        with self.lock:
+            if self.file is None:
+                torn = self._ends_torn()
+                self.file = open(self.path, "a", encoding="utf-8")
+                if torn:
+                    # start on a fresh line after a crash mid-append
+                    self.file.write("\n")
+            self.file.write("".join(
+                json.dumps({"q": question, "a": answer}, ensure_ascii=False) + "\n"
+                for question, answer in pairs
+            ))
+            self.file.flush()
+            self.pending += len(pairs)
+            if self.pending >= self.SYNC_EVERY:
+                self._sync()
+
+    def _ends_torn(self) -> bool:
+        if not os.path.exists(self.path) or os.path.getsize(self.path) == 0:
+            return False
+        with open(self.path, "rb") as f:
+            f.seek(-1, os.SEEK_END)
+            return f.read(1) != b"\n"
+
+    def _sync(self):
+        if self.file and self.pending:
+            os.fsync(self.file.fileno())
+        self.pending = 0
+        self.last_sync = time.monotonic()
+
+    def tick(self, table: dict):
+        """
+        Periodic housekeeping from the main loop. Returns a copy of the table
+        when a compaction is due; the caller passes it to write_snapshot().
+        """
+        now = time.monotonic()
+        with self.lock:
+            if self.pending and now - self.last_sync >= self.SYNC_SECONDS:
+                self._sync()
+        if now - self.last_compact >= self.COMPACT_SECONDS:
+            return self.rotate(table)
+        return None
+
+    def rotate(self, table: dict):
+        """Start a new journal and return the table it has to be folded into."""
+        with self.lock:
+            self.last_compact = time.monotonic()
+            # never rotate over a journal that hasn't been folded in yet
+            if self.compacting or not os.path.exists(self.path) or os.path.exists(self.rotated_path):
+                return None
+            self._sync()
+            if self.file:
+                self.file.close()
+                self.file = None
+            os.replace(self.path, self.rotated_path)
+            self.compacting = True
+            return dict(table)
+
+    def write_snapshot(self, snapshot: dict):
+        try:
+            save_word_table(snapshot)
+            os.remove(self.rotated_path)
+        finally:
+            self.compacting = False
+
+    def compact(self, table: dict):
+        snapshot = self.rotate(table)
+        if snapshot is not None:
+            self.write_snapshot(snapshot)
+
+# Data stores, empty until load_data() runs so importing the module is free
+WORD_TABLE = None
+WORD_JOURNAL = None
+ANSWER_INDEX = None
+PICTURES = None
+
+def load_data():
+    """
+    Load the word table (replaying the journal), the answer index and the
+    picture store, and start the ntfy notifier. Does nothing the second time,
+    and raises RuntimeError if wordlist_file has changed since.
+    """
+    global WORD_TABLE, WORD_JOURNAL, ANSWER_INDEX, PICTURES, NOTIFIER
+    if WORD_TABLE is not None:
+        if WORD_JOURNAL.path != WORDLIST_FILE + ".journal":
+            raise RuntimeError(f"Word table already loaded from {WORD_JOURNAL.path[:-len('.journal')]}, can't switch to {WORDLIST_FILE}")
+        return
+
+    if NTFY_SERVER and NTFY_TOPIC and NOTIFIER is None:
+        NOTIFIER = NtfyNotifier()
+        atexit.register(NOTIFIER.close)
+
+    if os.path.exists(WORDLIST_FILE):
+        with open(WORDLIST_FILE, "r", encoding="utf-8") as f:
+            table = json.load(f)
+    else:
+        table = {
+            "pracovny postup": "technique",
+            "viditelny": "visible",
+            "vazny": "serious",
+            "seriozny": "serious",
+            "vazny, seriozny": "serious",
+            "vedecke laboratorium": "science laboratory",
+            "krok": "step",
+            "vyznam, zmysel": "significance",
+            "burka": "storm",
+        }
+        save_word_table(table)
+
+    WORD_JOURNAL = WordJournal(WORDLIST_FILE + ".journal")
+    recovered = WORD_JOURNAL.recover(table)
+    if recovered:
+        print(f"Folded {recovered} words from an interrupted compaction into {WORDLIST_FILE}")
+    replayed = WORD_JOURNAL.replay(table)
+    if replayed:
+        print(f"Replayed {replayed} learned words from {WORD_JOURNAL.path}")
+    WORD_TABLE = table
+    # fold everything learned this session into the JSON file on the way out
+    atexit.register(lambda: WORD_JOURNAL.compact(WORD_TABLE))
+
+    ANSWER_INDEX = AnswerIndex(WORD_TABLE)
+    PICTURES = PictureStore(PICTURE_FILE)
+    atexit.register(METRICS.write)
 
 # ---------------- HELPERS ----------------
 
@@ -114,40 +436,93 @@ def strip_accents(text: str) -> str:
         if unicodedata.category(c) != "Mn"
     )
 
+# normalize() sees the same few hundred strings over and over in a session
+NORMALIZE_CACHE_SIZE = 4096
+
+@functools.lru_cache(maxsize=NORMALIZE_CACHE_SIZE)
 def normalize(text: str) -> str:
     text = text.strip().lower()
-    text = strip_accents(text)
-    return text
+    if text.isascii():
+        # nothing to decompose, skip NFD and the category filter
+        return text
+    return strip_accents(text)
 
-def find_target_page(context):
-    for page in context.pages:
-        if URLBASE in page.url:
-            return page
-    return None
+class AnswerIndex:
+    """
+    Normalized forward/reverse lookup tables for WORD_TABLE. Built once at
+    startup and updated through add(), so a lookup never scans the table.
+    """
+
+    def __init__(self, table=None):
+        self.forward = {}        # normalized question -> answer
+        self.reverse = {}        # normalized answer -> question
+        self.parts = {}          # one part of an "a, b" question -> answer
+        self.reverse_parts = {}  # one part of an "a, b" answer -> question
+        for key, value in (table or {}).items():
+            self.add(key, value)
+
+    def add(self, key: str, value: str):
+        if not key or not value:
+            return
+        key_norm = normalize(key)
+        value_norm = normalize(value)
+        self.forward[key_norm] = value
+        # the first mapping wins, same as the old linear reverse scan
+        self.reverse.setdefault(value_norm, key)
+        if "," in key_norm:
+            for part in key_norm.split(","):
+                if part.strip():
+                    self.parts.setdefault(part.strip(), value)
+        if "," in value_norm:
+            for part in value_norm.split(","):
+                if part.strip():
+                    self.reverse_parts.setdefault(part.strip(), key)
+
+    def _direct(self, word: str):
+        return self.forward.get(word) or self.reverse.get(word)
+
+    def lookup(self, word: str):
+        """Return the known translation of a normalized word, or None."""
+        answer = self._direct(word)
+        if answer:
+            return answer
+
+        # Multi-word question, try every part on its own
+        if "," in word:
+            for w in [w.strip() for w in word.split(",")]:
+                answer = self._direct(w)
+                if answer:
+                    return answer
+
+        # Question is a single part of a known "a, b" entry
+        return self.parts.get(word) or self.reverse_parts.get(word)
+
+def learn_word(question: str, answer: str):
+    WORD_TABLE[question] = answer
+    ANSWER_INDEX.add(question, answer)
+    WORD_JOURNAL.append(question, answer)
+
+def learn_words(pairs) -> int:
+    """learn_word() for many pairs at once, known questions are skipped. Returns how many were new."""
+    new = []
+    for question, answer in pairs:
+        if not question or not answer or question in WORD_TABLE:
+            continue
+        WORD_TABLE[question] = answer
+        ANSWER_INDEX.add(question, answer)
+        new.append((question, answer))
+    if new:
+        WORD_JOURNAL.append_many(new)
+    return len(new)
 
 def get_answer_auto_update(word: str) -> str:
     normalized_word = normalize(word)
 
-    # Direct match
-    answer = WORD_TABLE.get(normalized_word)
+    answer = ANSWER_INDEX.lookup(normalized_word)
+    METRICS.lookup(bool(answer))
     if answer:
         return answer
 
-    # Reverse lookup
-    for sk, en in WORD_TABLE.items():
-        if normalize(en) == normalized_word:
-            return sk
-
-    # Multi-word
-    if "," in normalized_word:
-        for w in [w.strip() for w in normalized_word.split(",")]:
-            answer = WORD_TABLE.get(w)
-            if answer:
-                return answer
-            for sk, en in WORD_TABLE.items():
-                if normalize(en) == w:
-                    return sk
-
     # Headless mode: use the word itself as the answer so the bot can still
     # submit something. The incorrect-autolearn handler will then capture the
     # real mapping from the #incorrect feedback div.
@@ -159,145 +534,1002 @@ def get_answer_auto_update(word: str) -> str:
     answer = input(f"Enter translation for unknown word '{word}': ").strip()
     if answer:
         answer = normalize(answer)
-        WORD_TABLE[normalized_word] = answer
-        with open(WORDLIST_FILE, "w", encoding="utf-8") as f:
-            json.dump(WORD_TABLE, f, ensure_ascii=False, indent=2)
+        learn_word(normalized_word, answer)
         print(f"New word added: '{word}' -> '{answer}'")
     return answer
 
-def human_click(page, locator_or_handle, min_delay=0.05, max_delay=0.2):
-    time.sleep(random.uniform(min_delay, max_delay))
-    if hasattr(locator_or_handle, "element_handle"):
-        handle = locator_or_handle.element_handle()
+def pause_seconds(min_delay: float, max_delay: float) -> float:
+    return random.uniform(min_delay, max_delay) * CLICK_DELAY_SCALE
+
+def key_delay() -> float:
+    return random.uniform(*KEY_DELAY_MS)
+
+# Sets an input's value in one go and fires the events typing would have
+FILL_JS = """
+(el, value) => {
+    el.focus();
+    el.value = value;
+    el.dispatchEvent(new Event("input", { bubbles: true }));
+    el.dispatchEvent(new KeyboardEvent("keyup", { bubbles: true, key: value.slice(-1) }));
+    el.dispatchEvent(new Event("change", { bubbles: true }));
+}
+"""
+
+def enter_answer(page, selector: str, answer: str):
+    field = page.locator(selector)
+    if INPUT_MODE == "fill":
+        field.evaluate(FILL_JS, answer)
     else:
-        handle = locator_or_handle
-    if handle:
-        page.evaluate("(el) => el.click()", handle)
+        field.click()
+        page.keyboard.type(answer, delay=key_delay())
+
+# Runs a list of clicks inside the page in one round trip. Every action is
+# { selector, index, delay, ready }: wait `delay` ms, then click the
+# index-th match of the selector, re-queried each time since clicks change
+# the DOM. With ready set the element is skipped unless enabled and visible.
+ACTIONS_JS = """
+async (actions) => {
+    const sleep = (ms) => new Promise((resolve) => setTimeout(resolve, ms));
+    const usable = (el) => {
+        const rect = el.getBoundingClientRect();
+        return !el.disabled && rect.width > 0 && rect.height > 0;
+    };
+    // every target is picked before the first click, so a list that
+    // re-renders or reorders after a click can't shift later indexes
+    const targets = actions.map((action) => document.querySelectorAll(action.selector)[action.index]);
+    const done = [];
+    for (const [i, action] of actions.entries()) {
+        if (action.delay > 0) await sleep(action.delay);
+        const el = targets[i];
+        const ok = !!el && el.isConnected && (!action.ready || usable(el));
+        if (ok) el.click();
+        done.push(ok);
+    }
+    return { clicked: done.filter(Boolean).length, done: done };
+}
+"""
+
+def click_action(selector: str, index=0, min_delay=0.0, max_delay=0.0, ready=False) -> dict:
+    return {
+        "selector": selector,
+        "index": index,
+        "delay": pause_seconds(min_delay, max_delay) * 1000,
+        "ready": ready,
+    }
+
+def run_actions(page, actions) -> dict:
+    return page.evaluate(ACTIONS_JS, actions)
+
+# ---------------- Metrics ----------------
+
+class Metrics:
+    """
+    Wall time and CDP round trips per handler, word table hits/misses and
+    points per minute. Written to METRICS_FILE every METRICS_INTERVAL
+    seconds, as JSON or as a Prometheus text file.
+    """
+
+    BUCKETS_MS = (50, 100, 250, 500, 1000, 2500, 5000, 10000)
+
+    def __init__(self):
+        self.started = time.time()
+        self.handlers = {}
+        self.cdp_calls = 0
+        self.lookups = {"hit": 0, "miss": 0}
+        self.first_points = None
+        self.first_points_at = None
+        self.points = None
+        self.settle = {}        # exercise type -> post-answer settle stats, filled by SettleTuner
+        self.last_write = time.monotonic()
+
+    def record(self, name: str, elapsed_ms: float, calls: int, ok: bool):
+        entry = self.handlers.get(name)
+        if entry is None:
+            entry = self.handlers[name] = {
+                "count": 0,
+                "failed": 0,
+                "total_ms": 0.0,
+                "max_ms": 0.0,
+                "cdp_calls": 0,
+                "buckets": [0] * (len(self.BUCKETS_MS) + 1),
+            }
+        entry["count"] += 1
+        entry["failed"] += 0 if ok else 1
+        entry["total_ms"] += elapsed_ms
+        entry["max_ms"] = max(entry["max_ms"], elapsed_ms)
+        entry["cdp_calls"] += calls
+        bucket = next((i for i, le in enumerate(self.BUCKETS_MS) if elapsed_ms <= le), len(self.BUCKETS_MS))
+        entry["buckets"][bucket] += 1
+
+    def lookup(self, hit: bool):
+        self.lookups["hit" if hit else "miss"] += 1
+
+    def observe_points(self, points: int):
+        if self.first_points is None:
+            self.first_points = points
+            self.first_points_at = time.time()
+        self.points = points
+
+    def points_per_minute(self) -> float:
+        if self.points is None:
+            return 0.0
+        minutes = (time.time() - self.first_points_at) / 60
+        if minutes <= 0:
+            return 0.0
+        return (self.points - self.first_points) / minutes
+
+    def snapshot(self) -> dict:
+        lookups = self.lookups["hit"] + self.lookups["miss"]
+        return {
+            "uptime_seconds": round(time.time() - self.started, 1),
+            "points": self.points,
+            "points_gained": None if self.points is None else self.points - self.first_points,
+            "points_per_minute": round(self.points_per_minute(), 2),
+            "cdp_calls": self.cdp_calls,
+            "settle": self.settle,
+            "word_lookups": dict(self.lookups, hit_rate=round(self.lookups["hit"] / lookups, 3) if lookups else None),
+            "handlers": {
+                name: {
+                    "count": e["count"],
+                    "failed": e["failed"],
+                    "avg_ms": round(e["total_ms"] / e["count"], 1),
+                    "max_ms": round(e["max_ms"], 1),
+                    "cdp_calls_per_run": round(e["cdp_calls"] / e["count"], 1),
+                    "histogram_ms": dict(zip([str(le) for le in self.BUCKETS_MS] + ["+Inf"], e["buckets"])),
+                }
+                for name, e in self.handlers.items()
+            },
+        }
+
+    def to_prometheus(self) -> str:
+        lines = ["# TYPE woca_handler_duration_ms histogram"]
+        for name, e in self.handlers.items():
+            cumulative = 0
+            for le, count in zip([str(le) for le in self.BUCKETS_MS] + ["+Inf"], e["buckets"]):
+                cumulative += count
+                lines.append(f'woca_handler_duration_ms_bucket{{handler="{name}",le="{le}"}} {cumulative}')
+            lines.append(f'woca_handler_duration_ms_sum{{handler="{name}"}} {e["total_ms"]:.1f}')
+            lines.append(f'woca_handler_duration_ms_count{{handler="{name}"}} {e["count"]}')
+        lines.append("# TYPE woca_handler_failures_total counter")
+        lines += [f'woca_handler_failures_total{{handler="{name}"}} {e["failed"]}' for name, e in self.handlers.items()]
+        lines.append("# TYPE woca_handler_cdp_calls_total counter")
+        lines += [f'woca_handler_cdp_calls_total{{handler="{name}"}} {e["cdp_calls"]}' for name, e in self.handlers.items()]
+        lines.append("# TYPE woca_cdp_calls_total counter")
+        lines.append(f"woca_cdp_calls_total {self.cdp_calls}")
+        lines.append("# TYPE woca_settle_timeout_ms gauge")
+        lines += [f'woca_settle_timeout_ms{{exercise="{name}"}} {e["timeout_ms"]}' for name, e in self.settle.items()]
+        lines.append("# TYPE woca_word_lookups_total counter")
+        lines += [f'woca_word_lookups_total{{result="{k}"}} {v}' for k, v in self.lookups.items()]
+        lines.append("# TYPE woca_points gauge")
+        lines.append(f"woca_points {self.points if self.points is not None else 0}")
+        lines.append("# TYPE woca_points_per_minute gauge")
+        lines.append(f"woca_points_per_minute {self.points_per_minute():.2f}")
+        return "\n".join(lines) + "\n"
+
+    def write(self):
+        self.last_write = time.monotonic()
+        if not METRICS_FILE:
+            return
+        if METRICS_FORMAT == "prometheus":
+            content = self.to_prometheus()
+        else:
+            content = json.dumps(self.snapshot(), indent=2)
+        tmp_file = METRICS_FILE + ".tmp"
+        with open(tmp_file, "w", encoding="utf-8") as f:
+            f.write(content)
+        os.replace(tmp_file, METRICS_FILE)
+
+    def maybe_write(self):
+        if METRICS_FILE and time.monotonic() - self.last_write >= METRICS_INTERVAL:
+            self.write()
+
+METRICS = Metrics()
+
+class CountingPage:
+    """
+    Wraps a Page (and the Locators/Keyboard it hands out) and counts every
+    call that goes to the browser. Building locators is local and not counted.
+    """
+
+    WRAPPED = ("Locator", "FrameLocator", "Keyboard", "Mouse")
+    # waits that don't talk to the page itself
+    NOT_COUNTED = ("wait_for_timeout",)
+
+    def __init__(self, target, metrics):
+        self._target = target
+        self._metrics = metrics
+
+    def _wrap(self, value):
+        if type(value).__name__ in self.WRAPPED:
+            return CountingPage(value, self._metrics)
+        return value
+
+    def __getattr__(self, name):
+        value = getattr(self._target, name)
+        if not callable(value):
+            return self._wrap(value)
+
+        def call(*args, **kwargs):
+            result = value(*args, **kwargs)
+            if type(result).__name__ in self.WRAPPED:
+                return CountingPage(result, self._metrics)
+            if name not in self.NOT_COUNTED:
+                self._metrics.cdp_calls += 1
+            return result
+        return call
+
+def call_handler(name, handler, page, state) -> bool:
+    start = time.perf_counter()
+    calls = METRICS.cdp_calls
+    ok = False
+    try:
+        ok = handler(page, state)
+        return ok
+    finally:
+        METRICS.record(name, (time.perf_counter() - start) * 1000, METRICS.cdp_calls - calls, ok)
+
+# ---------------- DOM Snapshot ----------------
+
+# Exercise containers in the order the main loop dispatches them. The first
+# visible one becomes state["active"]; "translateWord" (#q_word) is last.
+EXERCISE_IDS = [
+    "incorrect",
+    "oneOutOfMany",
+    "translateFallingWord",
+    "choosePicture",
+    "describePicture",
+    "pexeso",
+    "completeWord",
+    "chooseWord",
+    "transcribe",
+    "findPair",
+]
+
+# Reads everything the handlers need in a single round trip
+SNAPSHOT_JS = """
+(ids) => {
+    const visible = (el) => {
+        if (!el) return false;
+        if (window.getComputedStyle(el).visibility === "hidden") return false;
+        const rect = el.getBoundingClientRect();
+        return rect.width > 0 && rect.height > 0;
+    };
+    const text = (sel) => {
+        const el = document.querySelector(sel);
+        return el ? el.innerText : null;
+    };
+    const items = (sel) => Array.from(document.querySelectorAll(sel), (el) => ({
+        text: el.innerText,
+        visible: visible(el),
+        disabled: el.hasAttribute("disabled"),
+    }));
+
+    let active = ids.find((id) => visible(document.getElementById(id))) || null;
+    if (!active && visible(document.getElementById("q_word"))) active = "translateWord";
+
+    const points = document.getElementById("WocaPoints");
+    const state = {
+        active: active,
+        points: visible(points) ? points.innerText.trim() : null,
+        question: null,
+        answer: null,
+        choices: [],
+    };
+
+    switch (active) {
+        case "incorrect":
+            state.question = text("#incorrect .correctWordQuestion");
+            state.answer = text("#incorrect .correctWordAnswer");
+            state.next = visible(document.getElementById("incorrect-next-button"));
+            break;
+        case "oneOutOfMany":
+            state.question = text("#oneOutOfManyQuestionWord");
+            state.choices = items(".oneOutOfManyWord");
+            break;
+        case "translateFallingWord":
+            state.question = text("#tfw_word");
+            break;
+        case "choosePicture":
+            state.question = text("#choosePictureWord");
+            break;
+        case "describePicture": {
+            const img = document.getElementById("describePictureImg");
+            state.src = img ? img.getAttribute("src") : null;
+            break;
+        }
+        case "pexeso":
+            state.cards = Array.from(
+                document.querySelectorAll(".pexesoCardWrapper .pexesoFront"),
+                (el) => el.parentElement.getAttribute("w_id"),
+            );
+            break;
+        case "completeWord":
+            state.question = text("#completeWordQuestion");
+            state.answer = text("#completeWordAnswer");
+            state.choices = items("#characters .char");
+            break;
+        case "chooseWord":
+            state.question = text("#ch_word");
+            state.choices = items(".chooseWordAnswer");
+            break;
+        case "findPair":
+            state.questions = items("#q_words .fp_q");
+            state.choices = items("#a_words .fp_a");
+            break;
+        case "translateWord":
+            state.question = text("#q_word");
+            break;
+    }
+    return state;
+}
+"""
+
+def read_state(page) -> dict:
+    return page.evaluate(SNAPSHOT_JS, EXERCISE_IDS)
+
+# What identifies an exercise: its type and the texts it asks about. The
+# fields a handler changes itself (answer, visible, disabled) are left out,
+# so filling in or disabling the current exercise doesn't look like a new one
+def state_signature(state: dict) -> str:
+    return json.dumps([
+        state.get("active"),
+        state.get("question"),
+        state.get("src"),
+        state.get("cards"),
+        [item["text"] for item in state.get("choices") or []],
+        [item["text"] for item in state.get("questions") or []],
+    ])
+
+def moved_on(state, skip) -> bool:
+    """True when `state` shows a new exercise, not the `skip` one or an empty screen."""
+    return state is not None and state["active"] is not None and state_signature(state) != skip
+
+# Polls the snapshot inside the page until a new exercise is on screen (see
+# state_signature, a hidden container doesn't count), or `timeout` ms pass.
+# One round trip either way. The new state is only returned once it held
+# for a tick, so a question that is still rendering (or #incorrect before
+# its answer is filled in) isn't handed to a handler half done.
+SETTLE_JS = """
+async ({ ids, skip, timeout, tick }) => {
+    const snapshot = """ + SNAPSHOT_JS.strip() + """;
+    const texts = (list) => (list || []).map((item) => item.text);
+    const signature = (state) => JSON.stringify([
+        state.active, state.question ?? null, state.src ?? null, state.cards ?? null,
+        texts(state.choices), texts(state.questions),
+    ]);
+    const skipped = signature(skip);
+    const start = performance.now();
+    let candidate = null;
+    while (true) {
+        const state = snapshot(ids);
+        const moved = state.active !== null && signature(state) !== skipped;
+        const waited = performance.now() - start;
+        if (moved) {
+            const key = JSON.stringify({ ...state, points: null });
+            if (key === candidate) return { state: state, changed: true, waited: waited };
+            candidate = key;
+        } else {
+            candidate = null;
+        }
+        if (waited >= timeout) return { state: state, changed: moved, waited: waited };
+        await new Promise((resolve) => setTimeout(resolve, tick));
+    }
+}
+"""
+SETTLE_TICK_MS = 20
+
+# ---------------- Push Mode ----------------
+
+# Installs a MutationObserver that sends every changed snapshot to Python
+# through the exposed "wocaStateChanged" binding
+OBSERVER_JS = """
+(ids) => {
+    const snapshot = """ + SNAPSHOT_JS.strip() + """;
+    const install = () => {
+        if (window.__wocaObserver) window.__wocaObserver.disconnect();
+        let last = null;
+        const report = () => {
+            const state = snapshot(ids);
+            const key = JSON.stringify(state);
+            if (key === last) return;
+            last = key;
+            window.wocaStateChanged(state);
+        };
+        const observer = new MutationObserver(report);
+        observer.observe(document.body, {
+            subtree: true,
+            childList: true,
+            characterData: true,
+            attributes: true,
+            attributeFilter: ["style", "class", "hidden", "disabled", "src", "w_id"],
+        });
+        window.__wocaObserver = observer;
+        report();
+    };
+    if (document.body) install();
+    else document.addEventListener("DOMContentLoaded", install);
+}
+"""
+
+# How often the blocked loop hands control to Playwright so bindings can run
+PUSH_TICK_MS = 20
+
+class StateFeed:
+    """
+    Queue of snapshots pushed by the in-page observer. Binding callbacks only
+    run while Playwright is dispatching, so waiting is done in short
+    page.wait_for_timeout() ticks instead of sleeping.
+    """
+
+    def __init__(self, page):
+        self.page = page
+        self.queue = queue.Queue()
+        page.expose_binding("wocaStateChanged", self._on_state)
+        # re-install after reloads, and once right now for the current document
+        page.add_init_script(f"({OBSERVER_JS})({json.dumps(EXERCISE_IDS)})")
+        page.evaluate(OBSERVER_JS, EXERCISE_IDS)
+
+    def _on_state(self, source, state):
+        self.queue.put(state)
+
+    def _latest(self):
+        state = None
+        while True:
+            try:
+                state = self.queue.get_nowait()
+            except queue.Empty:
+                return state
+
+    def next_state(self, timeout: float, skip=None) -> dict:
+        """
+        Block until the observer reports a new exercise (see moved_on, any
+        state when `skip` is None) and the page stays quiet for a tick after
+        it, so a half rendered exercise isn't returned. Falls back to the last such state
+        or a fresh snapshot when time runs out.
+        """
+        deadline = time.monotonic() + timeout
+        candidate = None
+        while True:
+            state = self._latest()
+            if state is None:
+                if candidate is not None:
+                    return candidate
+            elif skip is None or moved_on(state, skip):
+                candidate = state
+            else:
+                candidate = None
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                return candidate or read_state(self.page)
+            self.page.wait_for_timeout(min(PUSH_TICK_MS, remaining * 1000))
 
 # ---------------- Picture Mapping ----------------
-PICTURE_FILE = "picturelist.json"
 
-# load picture map
-if os.path.exists(PICTURE_FILE):
-    with open(PICTURE_FILE, "r", encoding="utf-8") as f:
-        PICTURE_MAP = json.load(f)
-else:
-    PICTURE_MAP = {}
+class PictureStore:
+    """
+    src -> word map from PICTURE_FILE plus a normalized word -> src index.
+    The file is parsed once and re-read only when its mtime changes, which
+    is checked at most every CHECK_SECONDS.
+    """
 
-def save_picture_map():
-    with open(PICTURE_FILE, "w", encoding="utf-8") as f:
-        json.dump(PICTURE_MAP, f, ensure_ascii=False, indent=2)
+    CHECK_SECONDS = 1.0
 
-def handle_choose_picture(page):
-    container = page.locator("#choosePicture")
-    if container.count() == 0 or not container.is_visible():
-        return False
+    def __init__(self, path: str):
+        self.path = path
+        self.mtime = None
+        self.last_check = 0.0
+        self.pictures = {}
+        self.by_word = {}
+        self.reload()
 
-    # get the target word from the green button
-    target_word_raw = page.locator("#choosePictureWord").inner_text()
-    target_word = normalize(target_word_raw)
-
-    # load picture table
-    PICTURELIST_FILE = "picturelist.json"
-    if os.path.exists(PICTURELIST_FILE):
-        with open(PICTURELIST_FILE, "r", encoding="utf-8") as f:
-            PICTURE_TABLE = json.load(f)
-    else:
-        PICTURE_TABLE = {}
-
-    # figure out the correct src for this word
-    correct_src = None
-    for src, word in PICTURE_TABLE.items():
-        if normalize(word) == target_word:
-            correct_src = src
-            break
-    if not correct_src:
-        print(f"ChoosePicture: no mapping found for '{target_word}'")
-        return False
+    def _mtime(self):
+        try:
+            return os.path.getmtime(self.path)
+        except OSError:
+            return None
+
+    def reload(self):
+        self.last_check = time.monotonic()
+        mtime = self._mtime()
+        if mtime == self.mtime:
+            return
+        self.mtime = mtime
+        pictures = {}
+        if mtime is not None:
+            with open(self.path, "r", encoding="utf-8") as f:
+                pictures = json.load(f)
+        self.pictures = pictures
+        self.by_word = {}
+        for src, word in pictures.items():
+            self.by_word.setdefault(normalize(word), src)
+
+    def _fresh(self):
+        if time.monotonic() - self.last_check >= self.CHECK_SECONDS:
+            self.reload()
+
+    def answer_for(self, src: str):
+        self._fresh()
+        return self.pictures.get(src)
+
+    def src_for(self, word: str):
+        """src of the picture for a normalized word, or None."""
+        self._fresh()
+        return self.by_word.get(word)
+
+    def add(self, src: str, word: str):
+        self.pictures[src] = word
+        self.by_word.setdefault(normalize(word), src)
+        with open(self.path, "w", encoding="utf-8") as f:
+            json.dump(self.pictures, f, ensure_ascii=False, indent=2)
+        self.mtime = self._mtime()
+
+# ---------------- Answer Planning ----------------
+# Decisions shared by the sync and async engines. They only look at the
+# snapshot and the word/picture tables, the handlers do the page I/O.
+
+def answer_variants(answer: str):
+    """Normalized forms an answer can take on a card: whole, then each "a, b" part."""
+    answer_norm = normalize(answer)
+    variants = [answer_norm]
+    if "," in answer_norm:
+        variants += [part.strip() for part in answer_norm.split(",") if part.strip()]
+    return variants
+
+def edit_distance(a: str, b: str) -> int:
+    previous = list(range(len(b) + 1))
+    for i, ca in enumerate(a, 1):
+        current = [i]
+        for j, cb in enumerate(b, 1):
+            current.append(min(previous[j] + 1, current[j - 1] + 1, previous[j - 1] + (ca != cb)))
+        previous = current
+    return previous[-1]
+
+# Below this similarity a choice is never picked, a miss costs a wrong answer
+FUZZY_MIN_SIMILARITY = 0.6
+
+def plan_choice(question: str, raw_answer: str, choices):
+    """
+    Rank every choice against the expected answer and return (index, kind)
+    of the best one, or (None, None). An exact match beats a synonym (a
+    choice that translates back to the question), which beats the closest
+    choice by edit distance.
+    """
+    expected = answer_variants(raw_answer)
+    best = (None, None)
+    best_score = 0.0
+    for i, choice in enumerate(choices):
+        if not choice["visible"] or choice["disabled"]:
+            continue
+        text = normalize(choice["text"])
+        if not text:
+            continue
+        if text in expected:
+            return i, "exact"
 
-    # slick container
-    slick_container = page.locator("#word-img-container")
-    if slick_container.count() == 0:
-        return False
-
-    # prev/next buttons
-    btn_prev = slick_container.locator(".slick-prev")
-    btn_next = slick_container.locator(".slick-next")
-
-    # loop until the correct image is visible
-    max_attempts = 10
-    for _ in range(max_attempts):
-        visible_img = slick_container.locator(".slick-slide.slick-current img.picture")
-        if visible_img.count() == 0:
-            break
-        visible_src = visible_img.get_attribute("src")
-        if visible_src == correct_src:
-            # double click
-            el_handle = visible_img.element_handle()
-            if el_handle:
-                page.evaluate("(el) => el.click()", el_handle)
-                time.sleep(0.05)
-                page.evaluate("(el) => el.click()", el_handle)
-                print(f"ChoosePicture: clicked correct image for '{target_word}' | Current points:", page.locator("#WocaPoints").inner_text().strip())
-                return True
+        back = ANSWER_INDEX.lookup(text)
+        if back and question in answer_variants(back):
+            score, kind = 2.0, "synonym"
         else:
-            # click next if possible, else prev
-            if btn_next.is_enabled():
-                btn_next.click()
-            elif btn_prev.is_enabled():
-                btn_prev.click()
+            similarity = max(
+                1 - edit_distance(text, e) / max(len(text), len(e)) for e in expected
+            )
+            if similarity < FUZZY_MIN_SIMILARITY:
+                continue
+            score, kind = similarity, "fuzzy"
+
+        if score > best_score:
+            best, best_score = (i, kind), score
+    return best
+
+def plan_pexeso(cards):
+    # map w_id to the indexes of its front elements
+    card_map = {}
+    for i, w_id in enumerate(cards):
+        card_map.setdefault(w_id, []).append(i)
+    # first two cards of every w_id group, groups that can't pair are skipped
+    return [indexes[:2] for indexes in card_map.values() if len(indexes) >= 2]
+
+# Characters the page shows in place of a letter that still has to be picked
+COMPLETE_WORD_BLANKS = {"_"}
+
+def plan_missing_letters(target_norm: str, current_norm: str):
+    """
+    Align the partially filled answer against the target and return the
+    target letters that still have to be clicked, in order. A blank matches
+    any letter, a known letter must match itself, and target letters the
+    template doesn't show at all count as missing too.
+    """
+    n, m = len(current_norm), len(target_norm)
+    INF = n + m + 1
+    # cost[i][j]: unexplained letters aligning current[:i] with target[:j]
+    cost = [[INF] * (m + 1) for _ in range(n + 1)]
+    cost[0][0] = 0
+    for i in range(n + 1):
+        for j in range(m + 1):
+            c = cost[i][j]
+            if c == INF:
+                continue
+            if i < n and j < m and (current_norm[i] in COMPLETE_WORD_BLANKS or current_norm[i] == target_norm[j]):
+                cost[i + 1][j + 1] = min(cost[i + 1][j + 1], c)
+            if j < m:  # target letter not shown at all
+                cost[i][j + 1] = min(cost[i][j + 1], c + 1)
+            if i < n:  # template character with no place in the target
+                cost[i + 1][j] = min(cost[i + 1][j], c + 2)
+
+    # walk back from the end, preferring real matches
+    missing_letters = []
+    i, j = n, m
+    while i > 0 or j > 0:
+        c = cost[i][j]
+        if i > 0 and j > 0 and cost[i - 1][j - 1] == c and (
+            current_norm[i - 1] in COMPLETE_WORD_BLANKS or current_norm[i - 1] == target_norm[j - 1]
+        ):
+            if current_norm[i - 1] in COMPLETE_WORD_BLANKS:
+                missing_letters.append(target_norm[j - 1])
+            i, j = i - 1, j - 1
+        elif j > 0 and cost[i][j - 1] == c - 1:
+            missing_letters.append(target_norm[j - 1])
+            j -= 1
+        else:
+            i -= 1
+    missing_letters.reverse()
+    return missing_letters
+
+def plan_letter_clicks(missing_letters, letters):
+    """Button indexes for the missing letters, every button used at most once."""
+    pool = {}
+    for i, letter in enumerate(letters):
+        letter_text_raw = letter["text"]
+        if letter_text_raw.isupper():       # skip uppercase letters
+            continue
+        if letter["disabled"] or not letter["visible"]:
+            continue
+        pool.setdefault(normalize(letter_text_raw), []).append(i)
+
+    clicks = []
+    for missing in missing_letters:
+        indexes = pool.get(missing)
+        if not indexes:
+            print(f"CompleteWord: no button left for letter '{missing}'")
+            continue
+        clicks.append(indexes.pop(0))
+    return clicks
+
+# Clicks the chosen letter buttons in order, then submit when it's ready.
+# run_actions() resolves every button before the first click, so re-rendering
+# can't shift them; a button that got replaced in between is reported as not clicked.
+def complete_word_actions(clicks):
+    actions = [click_action("#characters .char", i, 0.05, 0.2) for i in clicks]
+    # an already complete word is submitted straight away
+    submit_delay = (0.1, 0.3) if clicks else (0, 0)
+    actions.append(click_action("#completeWordSubmitBtn", 0, *submit_delay, ready=True))
+    return actions
+
+def pexeso_actions(cards):
+    actions = []
+    for pair in plan_pexeso(cards):
+        for i in pair:
+            # two real clicks per card
+            actions.append(click_action(".pexesoCardWrapper .pexesoFront", i, *((0.05, 0.2) if actions else (0, 0))))
+            actions.append(click_action(".pexesoCardWrapper .pexesoFront", i, 0.05, 0.15))
+    return actions
+
+def find_pair_actions(pairs):
+    actions = []
+    for q_index, a_index in pairs:
+        # question button, then the matching answer button
+        actions.append(click_action("#q_words .fp_q", q_index, *((0.05, 0.2) if actions else (0, 0))))
+        actions.append(click_action("#a_words .fp_a", a_index, 0.05, 0.2))
+    return actions
+
+def plan_find_pair(question_items, answer_items):
+    """
+    Returns (question index, answer index) pairs and the questions left
+    without a match. Only the cards on screen are looked at, each one
+    resolved through ANSWER_INDEX in both directions.
+    """
+    # free answer cards by normalized text, duplicates kept in order
+    free_answers = {}
+    for j, a in enumerate(answer_items):
+        if not a["disabled"]:
+            free_answers.setdefault(normalize(a["text"]), []).append(j)
+
+    def take(text):
+        indexes = free_answers.get(text)
+        return indexes.pop(0) if indexes else None
+
+    pairs = []
+    unmatched = []
+    for i, q in enumerate(question_items):
+        if q["disabled"]:
+            continue
+        q_text = normalize(q["text"])
+        answer = ANSWER_INDEX.lookup(q_text)
+        a_index = None
+        if answer:
+            for variant in answer_variants(answer):
+                a_index = take(variant)
+                if a_index is not None:
+                    break
+        if a_index is None:
+            unmatched.append((i, q_text))
+        else:
+            pairs.append((i, a_index))
+
+    # the other direction: translate the remaining answer cards back
+    if unmatched:
+        by_question = {}
+        for a_text, indexes in free_answers.items():
+            question = ANSWER_INDEX.lookup(a_text)
+            if question and indexes:
+                for variant in answer_variants(question):
+                    by_question.setdefault(variant, a_text)
+        missing = []
+        for i, q_text in unmatched:
+            a_text = by_question.get(q_text)
+            a_index = take(a_text) if a_text else None
+            if a_index is None:
+                missing.append(q_text)
             else:
-                print("ChoosePicture: cannot navigate carousel")
-                break
-            time.sleep(random.uniform(0.2, 0.4))
+                pairs.append((i, a_index))
+        unmatched = missing
+
+    return pairs, unmatched
+
+def learn_from_feedback(state):
+    """Store the correction shown in #incorrect, returns the pair if it was new."""
+    if state["question"] is None or state["answer"] is None:
+        return None
+    correct_question = normalize(state["question"])
+    correct_answer   = normalize(state["answer"])
+    if not correct_question or not correct_answer:
+        return None
+    if correct_question in WORD_TABLE:
+        print(f"Auto-learn: '{correct_question}' already known, skipping")
+        return None
+    learn_word(correct_question, correct_answer)
+    print(f"Auto-learned: '{correct_question}' -> '{correct_answer}'")
+    return correct_question, correct_answer
+
+# ---------------- Points ----------------
+
+# Pace assumed for the ETA until points have gone up inside the window
+DEFAULT_SECONDS_PER_POINT = 1.75
+
+def format_duration(seconds: float) -> str:
+    seconds = int(seconds)
+    hours, rest = divmod(seconds, 3600)
+    minutes, seconds = divmod(rest, 60)
+    if hours:
+        return f"{hours}h {minutes:02d}m"
+    if minutes:
+        return f"{minutes}m {seconds:02d}s"
+    return f"{seconds}s"
+
+class PointsTracker:
+    """
+    #WocaPoints as seen in the state snapshot, one value per loop iteration,
+    so nothing reads the points on its own. The last WINDOW_SECONDS of
+    values give the current rate and the ETA to original + addon_points;
+    milestones, the target check and the ntfy reports all come from here.
+    """
 
-    print(f"ChoosePicture: could not find correct picture for '{target_word}'")
+    WINDOW_SECONDS = 120.0
+
+    def __init__(self, points: int):
+        self.original = points
+        self.points = points
+        self.target = None if addon_points == -1 else points + addon_points
+        self.last_milestone = points
+        self.started = time.time()
+        self.samples = collections.deque([(time.monotonic(), points)])
+        METRICS.observe_points(points)
+
+    def observe(self, points: int):
+        now = time.monotonic()
+        self.points = points
+        if len(self.samples) >= 2 and self.samples[-1][1] == points == self.samples[-2][1]:
+            # same value again, only stretch the plateau
+            self.samples[-1] = (now, points)
+        else:
+            self.samples.append((now, points))
+        # keep one sample older than the window as its left edge
+        while len(self.samples) > 2 and now - self.samples[1][0] >= self.WINDOW_SECONDS:
+            self.samples.popleft()
+        METRICS.observe_points(points)
+
+    def rate(self) -> float:
+        """Points per second over the window."""
+        (t0, p0), (t1, p1) = self.samples[0], self.samples[-1]
+        if t1 <= t0 or p1 <= p0:
+            return 0.0
+        return (p1 - p0) / (t1 - t0)
+
+    def eta_seconds(self):
+        """Seconds until the target at the current rate, None without a target."""
+        if self.target is None:
+            return None
+        remaining = self.target - self.points
+        if remaining <= 0:
+            return 0.0
+        rate = self.rate()
+        return remaining / rate if rate > 0 else remaining * DEFAULT_SECONDS_PER_POINT
+
+    def reached(self) -> bool:
+        return self.target is not None and self.points >= self.target
+
+    def new_milestones(self) -> int:
+        """How many milestone_reminder steps were crossed since the last call."""
+        crossed = 0
+        while milestone_reminder > 0 and self.points >= self.last_milestone + milestone_reminder:
+            self.last_milestone += milestone_reminder
+            crossed += 1
+        return crossed
+
+    def describe(self) -> str:
+        target = f"target: {self.target}" if self.target is not None else "no target"
+        parts = [
+            f"Current points: {self.points} (original: {self.original}, {target})",
+            f"{self.rate() * 60:.1f} points/min",
+        ]
+        eta = self.eta_seconds()
+        if eta is not None:
+            parts.append(f"ETA {format_duration(eta)}")
+        return " | ".join(parts)
+
+def report_started(tracker):
+    eta = tracker.eta_seconds()
+    estimate = format_duration(eta) if eta is not None else "no target set"
+    print(f"Starting at {tracker.original} points, target: {tracker.target}, estimated time: {estimate}")
+    notify_ntfy("Wocabee Bot Started", f"The bot has been started at {tracker.original} points (target: {tracker.target}), estimated time until finished = {estimate}")
+
+def report_milestones(tracker):
+    if tracker.new_milestones():
+        print("Milestone reached:", tracker.describe())
+        notify_ntfy("Wocabee Bot Progress Report", tracker.describe())
+
+def target_reached(tracker):
+    if tracker.reached():
+        print(f"Target reached: {tracker.points} points (original: {tracker.original}, addon: {addon_points}), stopping bot")
+        notify_ntfy("Wocabee Bot reached the target", f"Wocabee Bot has reached the target of {tracker.points} points (original: {tracker.original}, addon: {addon_points}), stopping and saving!")
+        return True
     return False
 
-def handle_describe_picture(page):
-    container = page.locator("#describePicture")
-    if container.count() == 0 or not container.is_visible():
-        return False
+def report_standard_view(tracker):
+    print("#WocaPoints not present — probably returned to standard view")
+    notify_ntfy("Wocabee Bot Finished", "Bot has stopped because it seems to have returned to standard view. The browser will now close.")
+    notify_ntfy("Wocabee Bot Final Report", f"Final points: {tracker.points} (original: {tracker.original}, gained: {tracker.points - tracker.original}) | Total time running: {int(time.time() - tracker.started)} seconds")
+
+# ---------------- Vocabulary Warm-up ----------------
+
+# [question, answer] text of every row of the package's word listing
+VOCAB_JS = """
+({ rows, question, answer }) => Array.from(document.querySelectorAll(rows), (row) => {
+    const q = row.querySelector(question);
+    const a = row.querySelector(answer);
+    return q && a ? [q.innerText, a.innerText] : null;
+}).filter(Boolean)
+"""
+VOCAB_TIMEOUT_MS = 5000
+
+def warm_up_vocabulary(page) -> int:
+    """
+    Read the package's vocabulary listing once and learn every pair before
+    the first exercise. The listing is read from VOCAB_URL in a side tab.
+    Returns the new word count.
+    """
+    if not VOCAB_WARMUP:
+        return 0
+    if not (VOCAB_URL and VOCAB_ROW_SELECTOR and VOCAB_QUESTION_SELECTOR and VOCAB_ANSWER_SELECTOR):
+        print("Vocabulary warm-up skipped: set vocab_url and the vocab_*_selector options for the package's word listing")
+        return 0
+    start = time.perf_counter()
+    source = page.context.new_page()
+    try:
+        source.goto(urljoin(page.url, VOCAB_URL), wait_until="domcontentloaded")
+        try:
+            source.locator(VOCAB_ROW_SELECTOR).first.wait_for(timeout=VOCAB_TIMEOUT_MS)
+        except Exception:
+            pass
+        rows = source.evaluate(VOCAB_JS, {
+            "rows": VOCAB_ROW_SELECTOR,
+            "question": VOCAB_QUESTION_SELECTOR,
+            "answer": VOCAB_ANSWER_SELECTOR,
+        })
+    finally:
+        source.close()
+
+    added = learn_words((normalize(q), normalize(a)) for q, a in rows)
+    print(f"Vocabulary warm-up: {len(rows)} rows read, {added} new words in {(time.perf_counter() - start) * 1000:.0f} ms")
+    if added:
+        notify_ntfy("Wocabee Bot Vocabulary Warm-up", f"Learned {added} words from the package listing")
+    return added
+
+# ---------------- Handlers ----------------
+
+# Finds the slide whose img.picture has the wanted src, jumps straight to it
+# with slick's own slickGoTo (or clicks the slide when the API isn't there)
+# and double clicks the picture, all in one round trip.
+CHOOSE_PICTURE_JS = """
+async (correctSrc) => {
+    const container = document.getElementById("word-img-container");
+    if (!container) return { found: false, slides: 0 };
+
+    const slides = Array.from(container.querySelectorAll(".slick-slide:not(.slick-cloned)"));
+    const slide = slides.find((el) => {
+        const img = el.querySelector("img.picture");
+        return img && img.getAttribute("src") === correctSrc;
+    });
+    if (!slide) return { found: false, slides: slides.length };
+
+    const index = Number(slide.getAttribute("data-slick-index") || slides.indexOf(slide));
+    const slider = container.matches(".slick-initialized")
+        ? container
+        : container.querySelector(".slick-initialized");
+    const $ = window.jQuery;
+    let jumped = false;
+    if ($ && slider && typeof $.fn.slick === "function") {
+        $(slider).slick("slickGoTo", index, true);
+        jumped = true;
+    } else {
+        slide.click();
+    }
+
+    const current = container.querySelector(".slick-slide.slick-current img.picture");
+    const img = current && current.getAttribute("src") === correctSrc
+        ? current
+        : slide.querySelector("img.picture");
+    img.click();
+    await new Promise((resolve) => setTimeout(resolve, 50));
+    img.click();
+    return { found: true, slides: slides.length, index: index, jumped: jumped };
+}
+"""
+
+def handle_choose_picture(page, state):
+    # get the target word from the green button
+    target_word = normalize(state["question"] or "")
 
-    img_elem = page.locator("#describePictureImg")
-    input_elem = page.locator("#describePictureAnswer")
-    submit_elem = page.locator("#describePictureSubmitBtn")
+    correct_src = PICTURES.src_for(target_word)
+    if not correct_src:
+        print(f"ChoosePicture: no mapping found for '{target_word}'")
+        return False
 
-    if img_elem.count() == 0 or input_elem.count() == 0 or submit_elem.count() == 0:
+    result = page.evaluate(CHOOSE_PICTURE_JS, correct_src)
+    if not result["found"]:
+        print(f"ChoosePicture: could not find correct picture for '{target_word}' among {result['slides']} slides")
         return False
 
-    src = img_elem.get_attribute("src")
-    answer = PICTURE_MAP.get(src)
+    print(f"ChoosePicture: clicked correct image for '{target_word}' (slide {result['index']}) | Current points:", state["points"])
+    return True
+
+def picture_answer_for(src: str):
+    answer = PICTURES.answer_for(src)
     if not answer:
         # Ask manually once and store for future runs
         answer = input(f"Enter English word for image {src}: ").strip()
         if answer:
-            PICTURE_MAP[src] = answer
-            save_picture_map()
-
-    # Type answer and submit
-    input_elem.click()
-    page.keyboard.type(answer, delay=random.randint(60, 120))
-    submit_elem.click()
+            PICTURES.add(src, answer)
+    return answer
 
-    print("DescribePicture answered:", answer, "| Current points:", page.locator("#WocaPoints").inner_text().strip())
-    return True
+def handle_describe_picture(page, state):
+    src = state.get("src")
+    if not src:
+        return False
 
-# ---------------- One-Out-Of-Many Handler ----------------
+    answer = picture_answer_for(src)
 
-def handle_translate_falling_word(page):
-    container = page.locator("#translateFallingWord")
-    if container.count() == 0 or not container.is_visible():
-        return False
+    # Type answer and submit
+    enter_answer(page, "#describePictureAnswer", answer)
+    page.locator("#describePictureSubmitBtn").click()
 
-    word_elem = page.locator("#tfw_word")
-    input_elem = page.locator("#translateFallingWordAnswer")
-    submit_elem = page.locator("#translateFallingWordSubmitBtn")
+    print("DescribePicture answered:", answer, "| Current points:", state["points"])
+    return True
 
-    if word_elem.count() == 0 or input_elem.count() == 0 or submit_elem.count() == 0:
+def handle_translate_falling_word(page, state):
+    word_raw = state["question"]
+    if word_raw is None:
         return False
-
-    word_raw = word_elem.inner_text()
     word = normalize(word_raw)
 
     if word in PLACEHOLDER_WORDS:
@@ -308,8 +1540,8 @@ def handle_translate_falling_word(page):
         print(f"TranslateFallingWord: no answer found for '{word_raw}'")
         return False
 
-    input_elem.click()
-    page.keyboard.type(answer, delay=random.randint(60, 120))
+    submit_elem = page.locator("#translateFallingWordSubmitBtn")
+    enter_answer(page, "#translateFallingWordAnswer", answer)
 
     # wait until button is enabled
     max_wait = 3.0  # seconds
@@ -319,24 +1551,18 @@ def handle_translate_falling_word(page):
         elapsed += 0.05
 
     submit_elem.click()
-    print("TranslateFallingWord answered:", answer, "| Current points:", page.locator("#WocaPoints").inner_text().strip())
+    print("TranslateFallingWord answered:", answer, "| Current points:", state["points"])
     return True
 
-def handle_choose_word(page):
-    container = page.locator("#chooseWord")
-    if container.count() == 0 or not container.is_visible():
-        return False
-
-    question_elem = page.locator("#ch_word")
-    answers = page.locator(".chooseWordAnswer")
-
-    if question_elem.count() == 0 or answers.count() == 0:
+def handle_choose_word(page, state):
+    question_raw = state["question"]
+    choices = state["choices"]
+    if question_raw is None or not choices:
         return False
 
-    question_raw = question_elem.inner_text()
     question = normalize(question_raw)
 
-    print("ChooseWord Question:", question_raw, "| Current points:", page.locator("#WocaPoints").inner_text().strip())
+    print("ChooseWord Question:", question_raw, "| Current points:", state["points"])
 
     # get expected answer (auto handles reverse)
     raw_answer = get_answer_auto_update(question)
@@ -344,86 +1570,31 @@ def handle_choose_word(page):
         print("ChooseWord: no known answer")
         return False
 
-    # split possible answers (comma-safe)
-    expected_parts = [normalize(p) for p in raw_answer.split(",")]
-
-    clicked = False
-
-    for i in range(answers.count()):
-        btn = answers.nth(i)
-        btn_text_raw = btn.inner_text()
-        btn_text = normalize(btn_text_raw)
-
-        for expected in expected_parts:
-            if expected in btn_text or btn_text in expected:
-                time.sleep(random.uniform(0.1, 0.3))
-                handle = btn.element_handle()
-                if handle:
-                    page.evaluate("(el) => el.click()", handle)
-                    print("ChooseWord: clicked", btn_text_raw, "| Current points:", page.locator("#WocaPoints").inner_text().strip())
-                    clicked = True
-                    break
-
-        if clicked:
-            break
-
-    if not clicked:
+    index, kind = plan_choice(question, raw_answer, choices)
+    if index is None:
         print("ChooseWord: answer not present in choices")
         time.sleep(0.5)
         return False
 
+    run_actions(page, [click_action(".chooseWordAnswer", index, 0.1, 0.3)])
+    print(f"ChooseWord: clicked ({kind})", choices[index]["text"], "| Current points:", state["points"])
     return True
 
-def handle_pexeso(page):
-    container = page.locator("#pexeso")
-    if container.count() == 0 or not container.is_visible():
+def handle_pexeso(page, state):
+    cards = state.get("cards") or []
+    if not cards:
         return False
 
-    fronts = page.locator(".pexesoCardWrapper .pexesoFront")
-    if fronts.count() == 0:
-        return False
-
-    # map w_id to list of front elements
-    card_map = {}
-    for i in range(fronts.count()):
-        wrapper = fronts.nth(i).locator("..")  # parent wrapper
-        w_id = wrapper.get_attribute("w_id")
-        if w_id not in card_map:
-            card_map[w_id] = []
-        card_map[w_id].append(fronts.nth(i))
-
-    # iterate over w_id groups and double-click each pair
-    for w_id, cards in card_map.items():
-        if len(cards) < 2:
-            continue  # can't pair if less than 2
-        first_card, second_card = cards[:2]  # take first two
-
-        for card in [first_card, second_card]:
-            handle = card.element_handle()
-            if handle:
-                # perform two real clicks
-                page.evaluate("(el) => el.click()", handle)
-                time.sleep(random.uniform(0.05, 0.15))
-                page.evaluate("(el) => el.click()", handle)
-                time.sleep(random.uniform(0.05, 0.2))
-
+    run_actions(page, pexeso_actions(cards))
     return True
 
-def handle_complete_word(page):
-    container = page.locator("#completeWord")
-    if container.count() == 0 or not container.is_visible():
+def handle_complete_word(page, state):
+    if state["question"] is None or state["answer"] is None:
         return False
 
-    question_elem = page.locator("#completeWordQuestion")
-    answer_elem = page.locator("#completeWordAnswer")
-    submit_elem = page.locator("#completeWordSubmitBtn")
-    if question_elem.count() == 0 or answer_elem.count() == 0 or submit_elem.count() == 0:
-        return False
-
-    word_raw = question_elem.inner_text()
+    word_raw = state["question"]
     word = normalize(word_raw)  # normalized lowercase
-    current_answer_raw = answer_elem.inner_text()
-    current_answer_norm = normalize(current_answer_raw)
+    current_answer_norm = normalize(state["answer"])
 
     if word in PLACEHOLDER_WORDS or not word:
         return False
@@ -436,63 +1607,29 @@ def handle_complete_word(page):
 
     target_answer_norm = normalize(target_answer)
 
-    # if current answer matches target, nothing to do
+    # if current answer matches target, only submit is left
     if current_answer_norm == target_answer_norm:
-        if submit_elem.is_visible() and submit_elem.is_enabled():
-            submit_handle = submit_elem.element_handle()
-            if submit_handle:
-                print("Clicking CompleteWord submit button (already complete)")
-                page.evaluate("(el) => el.click()", submit_handle)
-        return True
-
-    # find missing letters
-    missing_letters = []
-    for w_char, c_char in zip(target_answer_norm, current_answer_norm.ljust(len(target_answer_norm), "_")):
-        if w_char != c_char:
-            missing_letters.append(w_char)
-
-    print("CompleteWord Question:", word_raw)
-    print("Target answer:", target_answer)
-    print("Missing letters:", missing_letters)
-
-    # click letters
-    letter_buttons = page.locator("#characters .char")
-    for missing in missing_letters:
-        for i in range(letter_buttons.count()):
-            btn = letter_buttons.nth(i)
-            letter_text_raw = btn.inner_text()
-            if letter_text_raw.isupper():       # skip uppercase letters
-                continue
-            letter_text = normalize(letter_text_raw)
-            if letter_text == missing:
-                time.sleep(random.uniform(0.05, 0.2))
-                element_handle = btn.element_handle()
-                if element_handle:
-                    page.evaluate("(el) => el.click()", element_handle)
-                    break
-
-    # click submit if visible and enabled
-    if submit_elem.is_visible() and submit_elem.is_enabled():
-        time.sleep(random.uniform(0.1, 0.3))
-        submit_handle = submit_elem.element_handle()
-        if submit_handle:
-            print("Clicking CompleteWord submit button | Current points:", page.locator("#WocaPoints").inner_text().strip())
-            page.evaluate("(el) => el.click()", submit_handle)
+        clicks = []
+    else:
+        missing_letters = plan_missing_letters(target_answer_norm, current_answer_norm)
+        clicks = plan_letter_clicks(missing_letters, state["choices"])
+        print("CompleteWord Question:", word_raw)
+        print("Target answer:", target_answer)
+        print("Missing letters:", missing_letters)
+
+    result = run_actions(page, complete_word_actions(clicks))
+    if result["done"][-1]:
+        print("Clicked CompleteWord submit button | Current points:", state["points"])
     else:
         print("Submit button not ready yet, skipping for now")
 
     return True
 
-def handle_one_out_of_many(page):
-    container = page.locator("#oneOutOfMany")
-    if container.count() == 0 or not container.is_visible():
-        return False  # event not active
-
-    question_elem = page.locator("#oneOutOfManyQuestionWord")
-    if question_elem.count() == 0:
+def handle_one_out_of_many(page, state):
+    question_raw = state["question"]
+    if question_raw is None:
         return False
 
-    question_raw = question_elem.inner_text()
     question = normalize(question_raw)
     if question in PLACEHOLDER_WORDS:
         return False
@@ -502,103 +1639,433 @@ def handle_one_out_of_many(page):
         print("OneOutOfMany: answer not found")
         return False
 
-    choices = page.locator(".oneOutOfManyWord")
-    for i in range(choices.count()):
-        choice_elem = choices.nth(i)
-        if not choice_elem.is_visible():
-            continue
-        choice_text = normalize(choice_elem.inner_text())
-        if choice_text == answer:
-            time.sleep(random.uniform(0.05, 0.2))
-            print("OneOutOfMany answered:", choice_text, "| Current points:", page.locator("#WocaPoints").inner_text().strip())
-            choice_elem.click()
-            return True
-
-    print("OneOutOfMany: answer not present in choices")
-    return False
-
-def handle_find_pair(page):
-    container = page.locator("#findPair")
-    if container.count() == 0 or not container.is_visible():
+    index, kind = plan_choice(question, answer, state["choices"])
+    if index is None:
+        print("OneOutOfMany: answer not present in choices")
         return False
 
-    questions = page.locator("#q_words .fp_q")
-    answers = page.locator("#a_words .fp_a")
-    if questions.count() == 0 or answers.count() == 0:
+    print(f"OneOutOfMany answered ({kind}):", normalize(state["choices"][index]["text"]), "| Current points:", state["points"])
+    run_actions(page, [click_action(".oneOutOfManyWord", index, 0.05, 0.2)])
+    return True
+
+def handle_find_pair(page, state):
+    question_items = state.get("questions") or []
+    answer_items = state["choices"]
+    if not question_items or not answer_items:
         return False
 
-    # map questions by text for easy lookup
-    question_map = {}
-    for i in range(questions.count()):
-        q_elem = questions.nth(i)
-        q_text = normalize(q_elem.inner_text())
-        question_map[q_text] = q_elem
+    pairs, missing = plan_find_pair(question_items, answer_items)
+    if pairs:
+        run_actions(page, find_pair_actions(pairs))
+    for word in missing:
+        print(f"FindPair: no answer card found for '{word}'")
 
-    for orig_word, correct_answer in WORD_TABLE.items():
-        q_elem = question_map.get(orig_word)
-        if not q_elem:
-            continue
+    return True
 
-        # click question button
-        q_handle = q_elem.element_handle()
-        if q_handle:
-            page.evaluate("(el) => el.click()", q_handle)
-            time.sleep(random.uniform(0.05, 0.2))
-
-        # click corresponding answer button
-        found = False
-        for j in range(answers.count()):
-            a_elem = answers.nth(j)
-            a_text = normalize(a_elem.inner_text())
-            is_disabled = a_elem.get_attribute("disabled")
-            if a_text == correct_answer and not is_disabled:
-                a_handle = a_elem.element_handle()
-                if a_handle:
-                    page.evaluate("(el) => el.click()", a_handle)
-                    found = True
-                    break
-        if not found:
-            print(f"FindPair: answer '{correct_answer}' not present or disabled for '{orig_word}'")
+def handle_translate_word(page, state):
+    word_raw = state["question"] or ""
+    word = normalize(word_raw)
+    if word in PLACEHOLDER_WORDS:
+        return False
+    print("TranslateWord answered:", word_raw, " | Current points:", state["points"])
+    answer = get_answer_auto_update(word)
+    if answer:
+        enter_answer(page, "#translateWordAnswer", answer)
+        page.keyboard.press("Enter")
+    return True
 
+def handle_transcribe(page, state):
+    print("Skipping transcribe")
+    page.locator("#transcribeSkipBtn").click()
     return True
 
 # ---------------- Incorrect Auto-Learn Handler ----------------
 
-def handle_incorrect_autolearn(page):
+def handle_incorrect_autolearn(page, state):
     """
     When the #incorrect feedback div is visible, read the correct question/answer
-    from the DOM, save the mapping into wordlist.json, then click the 'next' button.
+    from the snapshot, save the mapping into wordlist.json, then click the 'next' button.
     Works in both headless and interactive mode.
     """
-    incorrect_div = page.locator("#incorrect")
-    if incorrect_div.count() == 0 or not incorrect_div.is_visible():
-        return False
+    try:
+        if state["question"] is None or state["answer"] is None:
+            return False
 
+        learned = learn_from_feedback(state)
+        if learned:
+            notify_ntfy("Wocabee Bot Auto-Learned", f"Learned new word: '{learned[0]}' -> '{learned[1]}'")
+
+        # Click the next button to continue
+        if state.get("next"):
+            page.locator("#incorrect-next-button").click()
+            print("Auto-learn: clicked next button | Current points:", state["points"])
+            return True
+
+    except Exception as e:
+        print("handle_incorrect_autolearn error:", e)
+
+    return False
+
+# Exercise id (state["active"]) -> handler, tried before the points check
+HANDLERS = {
+    "incorrect": handle_incorrect_autolearn,
+    "oneOutOfMany": handle_one_out_of_many,
+    "translateFallingWord": handle_translate_falling_word,
+    "choosePicture": handle_choose_picture,
+    "describePicture": handle_describe_picture,
+    "pexeso": handle_pexeso,
+    "completeWord": handle_complete_word,
+    "chooseWord": handle_choose_word,
+    "transcribe": handle_transcribe,
+    "findPair": handle_find_pair,
+}
+
+# Longest push-mode wait for a change while nothing is on screen
+IDLE_TIMEOUT = 1.0
+
+class SettleTuner:
+    """
+    After an answer the loop waits for the page to move on to a new exercise
+    (see moved_on), up to a per-type timeout. The timeout
+    starts at DEFAULT_SETTLE_MS and, once MIN_SAMPLES transitions were seen,
+    follows the p95 of the last SAMPLES waits times HEADROOM, clamped to
+    [MIN_SETTLE_MS, MAX_SETTLE_MS].
+    """
+
+    DEFAULT_SETTLE_MS = 400
+    MIN_SETTLE_MS = 150
+    MAX_SETTLE_MS = 3000
+    SAMPLES = 50
+    MIN_SAMPLES = 5
+    HEADROOM = 1.5
+
+    def __init__(self, metrics):
+        self.metrics = metrics
+        self.waits = {}   # exercise type -> recent transition times in ms
+
+    def timeout_ms(self, kind: str) -> float:
+        waits = self.waits.get(kind)
+        if not waits or len(waits) < self.MIN_SAMPLES:
+            return self.DEFAULT_SETTLE_MS
+        ordered = sorted(waits)
+        p95 = ordered[min(len(ordered) - 1, int(len(ordered) * 0.95))]
+        return min(self.MAX_SETTLE_MS, max(self.MIN_SETTLE_MS, p95 * self.HEADROOM))
+
+    def record(self, kind: str, waited_ms: float, changed: bool):
+        waits = self.waits.setdefault(kind, collections.deque(maxlen=self.SAMPLES))
+        # a timeout says nothing about how long a real transition takes
+        if changed:
+            waits.append(waited_ms)
+        self.metrics.settle[kind] = {
+            "timeout_ms": round(self.timeout_ms(kind), 1),
+            "last_wait_ms": round(waited_ms, 1),
+            "samples": len(waits),
+            "timeouts": self.metrics.settle.get(kind, {}).get("timeouts", 0) + (0 if changed else 1),
+        }
+
+SETTLE = SettleTuner(METRICS)
+
+def wait_after_handler(page, feed, state):
+    """Wait for the page to move on after an answer, returns the state it moved to."""
+    kind = state["active"]
+    skip = state_signature(state)
+    timeout_ms = SETTLE.timeout_ms(kind)
+    if feed:
+        start = time.monotonic()
+        new_state = feed.next_state(timeout_ms / 1000, skip=skip)
+        SETTLE.record(kind, (time.monotonic() - start) * 1000, moved_on(new_state, skip))
+        return new_state
     try:
-        correct_question_elem = incorrect_div.locator(".correctWordQuestion")
-        correct_answer_elem   = incorrect_div.locator(".correctWordAnswer")
+        result = page.evaluate(SETTLE_JS, {"ids": EXERCISE_IDS, "skip": state, "timeout": timeout_ms, "tick": SETTLE_TICK_MS})
+    except Exception as e:
+        # navigation wipes the page context mid-wait, the next loop reads afresh
+        print("Settle wait interrupted:", e)
+        return None
+    SETTLE.record(kind, result["waited"], result["changed"])
+    return result["state"]
+
+def wait_idle(feed):
+    if feed:
+        return feed.next_state(IDLE_TIMEOUT)
+    time.sleep(0.1)
+    return None
 
-        if correct_question_elem.count() == 0 or correct_answer_elem.count() == 0:
-            return False
+# ---------------- Async Engine ----------------
+# Same handlers on playwright.async_api, selected with --async / async_engine.
+# Journal compaction and prompts run in worker threads so they overlap with
+# waiting for the next exercise instead of stalling the loop.
+
+BACKGROUND_TASKS = set()
+
+def spawn_blocking(func, *args):
+    """Run a blocking call in a worker thread without waiting for it."""
+    task = asyncio.ensure_future(asyncio.to_thread(func, *args))
+    BACKGROUND_TASKS.add(task)
+    task.add_done_callback(BACKGROUND_TASKS.discard)
+    return task
+
+async def drain_background():
+    if BACKGROUND_TASKS:
+        await asyncio.gather(*BACKGROUND_TASKS, return_exceptions=True)
+
+async def aget_answer(word: str) -> str:
+    # known words are answered inline, only the prompt/save path needs a thread
+    answer = ANSWER_INDEX.lookup(normalize(word))
+    if answer:
+        METRICS.lookup(True)
+        return answer
+    return await asyncio.to_thread(get_answer_auto_update, word)
+
+async def aenter_answer(page, selector: str, answer: str):
+    field = page.locator(selector)
+    if INPUT_MODE == "fill":
+        await field.evaluate(FILL_JS, answer)
+    else:
+        await field.click()
+        await page.keyboard.type(answer, delay=key_delay())
+
+async def arun_actions(page, actions) -> dict:
+    return await page.evaluate(ACTIONS_JS, actions)
+
+async def aread_state(page) -> dict:
+    return await page.evaluate(SNAPSHOT_JS, EXERCISE_IDS)
+
+class AsyncStateFeed:
+    """Push-mode feed for the async engine, bindings run on the event loop."""
+
+    def __init__(self, page):
+        self.page = page
+        self.queue = asyncio.Queue()
 
-        correct_question = normalize(correct_question_elem.inner_text().strip())
-        correct_answer   = normalize(correct_answer_elem.inner_text().strip())
+    @classmethod
+    async def create(cls, page):
+        feed = cls(page)
+        await page.expose_binding("wocaStateChanged", feed._on_state)
+        await page.add_init_script(f"({OBSERVER_JS})({json.dumps(EXERCISE_IDS)})")
+        await page.evaluate(OBSERVER_JS, EXERCISE_IDS)
+        return feed
 
-        if correct_question and correct_answer:
-            if correct_question not in WORD_TABLE:
-                WORD_TABLE[correct_question] = correct_answer
-                with open(WORDLIST_FILE, "w", encoding="utf-8") as f:
-                    json.dump(WORD_TABLE, f, ensure_ascii=False, indent=2)
-                print(f"Auto-learned: '{correct_question}' -> '{correct_answer}'")
-                notify_ntfy("Wocabee Bot Auto-Learned", f"Learned new word: '{correct_question}' -> '{correct_answer}'")
+    def _on_state(self, source, state):
+        self.queue.put_nowait(state)
+
+    async def next_state(self, timeout: float, skip=None) -> dict:
+        deadline = time.monotonic() + timeout
+        candidate = None
+        while True:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                return candidate or await aread_state(self.page)
+            # once there's a candidate, a quiet tick means it's done rendering
+            wait = min(PUSH_TICK_MS / 1000, remaining) if candidate is not None else remaining
+            try:
+                state = await asyncio.wait_for(self.queue.get(), wait)
+            except asyncio.TimeoutError:
+                if candidate is not None:
+                    return candidate
+                return await aread_state(self.page)
+            # skip straight to the most recent report
+            while not self.queue.empty():
+                state = self.queue.get_nowait()
+            if skip is None or moved_on(state, skip):
+                candidate = state
             else:
-                print(f"Auto-learn: '{correct_question}' already known, skipping")
+                candidate = None
 
-        # Click the next button to continue
-        next_btn = page.locator("#incorrect-next-button")
-        if next_btn.count() > 0 and next_btn.is_visible():
-            next_btn.click()
-            print("Auto-learn: clicked next button | Current points:", page.locator("#WocaPoints").inner_text().strip())
+async def ahandle_choose_picture(page, state):
+    target_word = normalize(state["question"] or "")
+
+    correct_src = PICTURES.src_for(target_word)
+    if not correct_src:
+        print(f"ChoosePicture: no mapping found for '{target_word}'")
+        return False
+
+    result = await page.evaluate(CHOOSE_PICTURE_JS, correct_src)
+    if not result["found"]:
+        print(f"ChoosePicture: could not find correct picture for '{target_word}' among {result['slides']} slides")
+        return False
+
+    print(f"ChoosePicture: clicked correct image for '{target_word}' (slide {result['index']}) | Current points:", state["points"])
+    return True
+
+async def ahandle_describe_picture(page, state):
+    src = state.get("src")
+    if not src:
+        return False
+
+    answer = PICTURES.answer_for(src) or await asyncio.to_thread(picture_answer_for, src)
+
+    await aenter_answer(page, "#describePictureAnswer", answer)
+    await page.locator("#describePictureSubmitBtn").click()
+
+    print("DescribePicture answered:", answer, "| Current points:", state["points"])
+    return True
+
+async def ahandle_translate_falling_word(page, state):
+    word_raw = state["question"]
+    if word_raw is None:
+        return False
+    word = normalize(word_raw)
+    if word in PLACEHOLDER_WORDS:
+        return False
+
+    answer = await aget_answer(word)
+    if not answer:
+        print(f"TranslateFallingWord: no answer found for '{word_raw}'")
+        return False
+
+    submit_elem = page.locator("#translateFallingWordSubmitBtn")
+    await aenter_answer(page, "#translateFallingWordAnswer", answer)
+
+    # wait until button is enabled
+    max_wait = 3.0  # seconds
+    elapsed = 0
+    while not await submit_elem.is_enabled() and elapsed < max_wait:
+        await asyncio.sleep(0.05)
+        elapsed += 0.05
+
+    await submit_elem.click()
+    print("TranslateFallingWord answered:", answer, "| Current points:", state["points"])
+    return True
+
+async def ahandle_choose_word(page, state):
+    question_raw = state["question"]
+    choices = state["choices"]
+    if question_raw is None or not choices:
+        return False
+
+    print("ChooseWord Question:", question_raw, "| Current points:", state["points"])
+
+    question = normalize(question_raw)
+    raw_answer = await aget_answer(question)
+    if not raw_answer:
+        print("ChooseWord: no known answer")
+        return False
+
+    index, kind = plan_choice(question, raw_answer, choices)
+    if index is None:
+        print("ChooseWord: answer not present in choices")
+        await asyncio.sleep(0.5)
+        return False
+
+    await arun_actions(page, [click_action(".chooseWordAnswer", index, 0.1, 0.3)])
+    print(f"ChooseWord: clicked ({kind})", choices[index]["text"], "| Current points:", state["points"])
+    return True
+
+async def ahandle_pexeso(page, state):
+    cards = state.get("cards") or []
+    if not cards:
+        return False
+
+    await arun_actions(page, pexeso_actions(cards))
+    return True
+
+async def ahandle_complete_word(page, state):
+    if state["question"] is None or state["answer"] is None:
+        return False
+
+    word_raw = state["question"]
+    word = normalize(word_raw)
+    current_answer_norm = normalize(state["answer"])
+    if word in PLACEHOLDER_WORDS or not word:
+        return False
+
+    target_answer = await aget_answer(word)
+    if not target_answer:
+        print(f"CompleteWord: no answer found for '{word_raw}'")
+        return False
+
+    target_answer_norm = normalize(target_answer)
+
+    if current_answer_norm == target_answer_norm:
+        clicks = []
+    else:
+        missing_letters = plan_missing_letters(target_answer_norm, current_answer_norm)
+        clicks = plan_letter_clicks(missing_letters, state["choices"])
+        print("CompleteWord Question:", word_raw)
+        print("Target answer:", target_answer)
+        print("Missing letters:", missing_letters)
+
+    result = await arun_actions(page, complete_word_actions(clicks))
+    if result["done"][-1]:
+        print("Clicked CompleteWord submit button | Current points:", state["points"])
+    else:
+        print("Submit button not ready yet, skipping for now")
+    return True
+
+async def ahandle_one_out_of_many(page, state):
+    question_raw = state["question"]
+    if question_raw is None:
+        return False
+    question = normalize(question_raw)
+    if question in PLACEHOLDER_WORDS:
+        return False
+
+    answer = await aget_answer(question)
+    if not answer:
+        print("OneOutOfMany: answer not found")
+        return False
+
+    index, kind = plan_choice(question, answer, state["choices"])
+    if index is None:
+        print("OneOutOfMany: answer not present in choices")
+        return False
+
+    print(f"OneOutOfMany answered ({kind}):", normalize(state["choices"][index]["text"]), "| Current points:", state["points"])
+    await arun_actions(page, [click_action(".oneOutOfManyWord", index, 0.05, 0.2)])
+    return True
+
+async def ahandle_find_pair(page, state):
+    question_items = state.get("questions") or []
+    answer_items = state["choices"]
+    if not question_items or not answer_items:
+        return False
+
+    pairs, missing = plan_find_pair(question_items, answer_items)
+    if pairs:
+        await arun_actions(page, find_pair_actions(pairs))
+    for word in missing:
+        print(f"FindPair: no answer card found for '{word}'")
+    return True
+
+async def ahandle_translate_word(page, state):
+    word_raw = state["question"] or ""
+    word = normalize(word_raw)
+    if word in PLACEHOLDER_WORDS:
+        return False
+    print("TranslateWord answered:", word_raw, " | Current points:", state["points"])
+    answer = await aget_answer(word)
+    if answer:
+        await aenter_answer(page, "#translateWordAnswer", answer)
+        await page.keyboard.press("Enter")
+    return True
+
+async def acall_handler(name, handler, page, state) -> bool:
+    start = time.perf_counter()
+    calls = METRICS.cdp_calls
+    ok = False
+    try:
+        ok = await handler(page, state)
+        return ok
+    finally:
+        METRICS.record(name, (time.perf_counter() - start) * 1000, METRICS.cdp_calls - calls, ok)
+
+async def ahandle_transcribe(page, state):
+    print("Skipping transcribe")
+    await page.locator("#transcribeSkipBtn").click()
+    return True
+
+async def ahandle_incorrect_autolearn(page, state):
+    try:
+        if state["question"] is None or state["answer"] is None:
+            return False
+
+        learned = learn_from_feedback(state)
+        if learned:
+            notify_ntfy("Wocabee Bot Auto-Learned", f"Learned new word: '{learned[0]}' -> '{learned[1]}'")
+
+        if state.get("next"):
+            await page.locator("#incorrect-next-button").click()
+            print("Auto-learn: clicked next button | Current points:", state["points"])
             return True
 
     except Exception as e:
@@ -606,155 +2073,386 @@ def handle_incorrect_autolearn(page):
 
     return False
 
+ASYNC_HANDLERS = {
+    "incorrect": ahandle_incorrect_autolearn,
+    "oneOutOfMany": ahandle_one_out_of_many,
+    "translateFallingWord": ahandle_translate_falling_word,
+    "choosePicture": ahandle_choose_picture,
+    "describePicture": ahandle_describe_picture,
+    "pexeso": ahandle_pexeso,
+    "completeWord": ahandle_complete_word,
+    "chooseWord": ahandle_choose_word,
+    "transcribe": ahandle_transcribe,
+    "findPair": ahandle_find_pair,
+}
+
+async def await_after_handler(page, feed, state):
+    kind = state["active"]
+    skip = state_signature(state)
+    timeout_ms = SETTLE.timeout_ms(kind)
+    if feed:
+        start = time.monotonic()
+        new_state = await feed.next_state(timeout_ms / 1000, skip=skip)
+        SETTLE.record(kind, (time.monotonic() - start) * 1000, moved_on(new_state, skip))
+        return new_state
+    try:
+        result = await page.evaluate(SETTLE_JS, {"ids": EXERCISE_IDS, "skip": state, "timeout": timeout_ms, "tick": SETTLE_TICK_MS})
+    except Exception as e:
+        print("Settle wait interrupted:", e)
+        return None
+    SETTLE.record(kind, result["waited"], result["changed"])
+    return result["state"]
+
+async def await_idle(feed):
+    if feed:
+        return await feed.next_state(IDLE_TIMEOUT)
+    await asyncio.sleep(0.1)
+    return None
+
 # ------------- Main Loop -------------
 
-StopBot = False
+def find_target_page(context):
+    for page in context.pages:
+        if URLBASE in page.url:
+            return page
+    return None
 
-with sync_playwright() as p:
+LAUNCH_ARGS = ["--no-sandbox", "--remote-debugging-port=9222"]
+
+def connect_page(p):
+    # try to attach to an existing browser via CDP (remote debugging)
+    try:
+        browser = p.chromium.connect_over_cdp(DEBUG_PORT)
+        context = browser.contexts[0]
+        page = find_target_page(context)
+        if not page:
+            raise RuntimeError(f"No open tab found containing '{URLBASE}'")
+        print("Attached to tab:", page.url)
+    except Exception as e:
+        # connection refused / no browser running - fall back to launching a fresh one
+        print("CDP connection failed (", e, "), launching new browser instance")
+        browser = p.chromium.launch(headless=False, args=LAUNCH_ARGS)
+        context = browser.new_context()
+        page = context.new_page()
+        # if a URL was provided, navigate there so the bot has a page to work with
+        if URLBASE:
+            page.goto(URLBASE)
+        print("Opened new browser, current URL:", page.url)
+    return page
+
+async def aconnect_page(p):
     try:
-        # try to attach to an existing browser via CDP (remote debugging)
+        browser = await p.chromium.connect_over_cdp(DEBUG_PORT)
+        context = browser.contexts[0]
+        page = find_target_page(context)
+        if not page:
+            raise RuntimeError(f"No open tab found containing '{URLBASE}'")
+        print("Attached to tab:", page.url)
+    except Exception as e:
+        print("CDP connection failed (", e, "), launching new browser instance")
+        browser = await p.chromium.launch(headless=False, args=LAUNCH_ARGS)
+        context = await browser.new_context()
+        page = await context.new_page()
+        if URLBASE:
+            await page.goto(URLBASE)
+        print("Opened new browser, current URL:", page.url)
+    return page
+
+def report_startup_error():
+    tb = traceback.format_exc()
+    print("Startup/Connection error:", tb)
+    notify_ntfy("Wocabee Bot Startup Error", tb)
+
+def run_sync(page=None) -> bool:
+    """Solve on `page`, or on the tab found over CDP when none is given."""
+    if page is not None:
+        return solve(page)
+    with sync_playwright() as p:
         try:
-            browser = p.chromium.connect_over_cdp(DEBUG_PORT)
-            context = browser.contexts[0]
-            page = find_target_page(context)
-            if not page:
-                raise RuntimeError(f"No open tab found containing '{URLBASE}'")
-            print("Attached to tab:", page.url)
-        except Exception as e:
-            # connection refused / no browser running - fall back to launching a fresh one
-            print("CDP connection failed (", e, "), launching new browser instance")
-            browser = p.chromium.launch(
-                headless=False,
-                args=["--no-sandbox","--remote-debugging-port=9222"]
-            )
-            context = browser.new_context()
-            page = context.new_page()
-            # if a URL was provided, navigate there so the bot has a page to work with
-            if URLBASE:
-                # ensure we have a proper scheme
-                if not URLBASE.startswith(("http://", "https://")):
-                    page.goto("https://" + URLBASE)
-                else:
-                    page.goto(URLBASE)
-            print("Opened new browser, current URL:", page.url)
-        
-        original_points = int(page.locator("#WocaPoints").inner_text().strip())
-        last_milestone = original_points  # store the last milestone notified
-
-        one_time = time.time()
+            page = connect_page(p)
+        except Exception:
+            report_startup_error()
+            return False
+        return solve(page)
+
+def solve(page) -> bool:
+    """Main loop, returns True once the bot is done with the package."""
+    StopBot = False
+
+    try:
+        # every call the solver makes through `page` is counted
+        page = CountingPage(page, METRICS)
+
+        # the first snapshot gives the starting points and is handled as usual
+        next_state = read_state(page)
+        if next_state["points"] is None:
+            raise RuntimeError("#WocaPoints not found, is the practice page open?")
+        tracker = PointsTracker(int(next_state["points"]))
+        report_started(tracker)
+
+        feed = StateFeed(page) if PUSH_MODE else None
+        if feed:
+            print("Push mode enabled, waiting for DOM changes instead of polling")
 
         while True:
             try:
-                # 0. Handle incorrect feedback — auto-learn and advance
-                if handle_incorrect_autolearn(page):
-                    page.wait_for_timeout(400)
+                snapshot = WORD_JOURNAL.tick(WORD_TABLE)
+                if snapshot is not None:
+                    WORD_JOURNAL.write_snapshot(snapshot)
+                METRICS.maybe_write()
+
+                # one round trip for the whole page state, or the pushed one
+                state = next_state if next_state is not None else read_state(page)
+                next_state = None
+                active = state["active"]
+                if state["points"] is not None:
+                    tracker.observe(int(state["points"]))
+
+                # 0. incorrect feedback first, then whichever exercise is shown
+                handler = HANDLERS.get(active)
+                if handler and call_handler(active, handler, page, state):
+                    next_state = wait_after_handler(page, feed, state)
                     continue
 
-                # 1. Handle one-out-of-many
-                if handle_one_out_of_many(page):
-                    page.wait_for_timeout(400)
-                    continue
-                
-                if handle_translate_falling_word(page):
-                    page.wait_for_timeout(400)
-                    continue
+                if state["points"] is None:
+                    report_standard_view(tracker)
+                    return True
 
-                if handle_choose_picture(page):
-                    page.wait_for_timeout(400)
-                    continue
+                report_milestones(tracker)
 
-                if handle_describe_picture(page):
-                    page.wait_for_timeout(400)
-                    continue
+                if target_reached(tracker):
+                    StopBot = True
 
-                if handle_pexeso(page):
-                    page.wait_for_timeout(400)
-                    continue
+                if StopBot:
+                    page.locator("#backBtn").wait_for(timeout=5000)
+                    page.click("#backBtn")
+                    try:
+                        page.locator("#standardView").wait_for(state="visible", timeout=15000)
+                        notify_ntfy("Wocabee Bot Finished", "Bot has stopped and returned to standard view. The browser will now safely close.")
+                    except Exception as e:
+                        notify_ntfy("Wocabee Bot Error", f"Failed to load #standardView after clicking back. Exiting anyway. Error: {e}")
+                    return True
 
-                if handle_complete_word(page):
-                    page.wait_for_timeout(400)
+                # 3. TRANSLATE INPUT
+                if active == "translateWord" and call_handler(active, handle_translate_word, page, state):
+                    next_state = wait_after_handler(page, feed, state)
                     continue
 
-                if handle_choose_word(page):
-                    page.wait_for_timeout(400)
-                    continue
+                next_state = wait_idle(feed)
 
-                # 2. SOUND / TRANSCRIBE
-                transcribe = page.locator("#transcribe")
-                if transcribe.count() > 0 and transcribe.is_visible():
-                    print("Skipping transcribe")
-                    page.locator("#transcribeSkipBtn").click()
-                    page.wait_for_timeout(300)
-                    continue
+            except Exception as e_inner:
+                tb = traceback.format_exc()
+                print("Runtime error:", tb)
+                notify_ntfy("Wocabee Bot Runtime Error", tb)
+                next_state = None
+                time.sleep(1)
 
-                if handle_find_pair(page):
-                    page.wait_for_timeout(400)
+    except Exception:
+        report_startup_error()
+        return False
+
+async def run_async(page=None) -> bool:
+    """Async counterpart of run_sync(), `page` is an async_api Page."""
+    try:
+        if page is not None:
+            return await asolve(page)
+        async with async_playwright() as p:
+            try:
+                page = await aconnect_page(p)
+            except Exception:
+                report_startup_error()
+                return False
+            return await asolve(page)
+    finally:
+        # let a running compaction finish before the loop closes
+        await drain_background()
+
+async def asolve(page) -> bool:
+    StopBot = False
+
+    try:
+        page = CountingPage(page, METRICS)
+
+        next_state = await aread_state(page)
+        if next_state["points"] is None:
+            raise RuntimeError("#WocaPoints not found, is the practice page open?")
+        tracker = PointsTracker(int(next_state["points"]))
+        report_started(tracker)
+
+        feed = await AsyncStateFeed.create(page) if PUSH_MODE else None
+        if feed:
+            print("Push mode enabled, waiting for DOM changes instead of polling")
+
+        while True:
+            try:
+                snapshot = WORD_JOURNAL.tick(WORD_TABLE)
+                if snapshot is not None:
+                    spawn_blocking(WORD_JOURNAL.write_snapshot, snapshot)
+                METRICS.maybe_write()
+
+                state = next_state if next_state is not None else await aread_state(page)
+                next_state = None
+                active = state["active"]
+                if state["points"] is not None:
+                    tracker.observe(int(state["points"]))
+
+                handler = ASYNC_HANDLERS.get(active)
+                if handler and await acall_handler(active, handler, page, state):
+                    next_state = await await_after_handler(page, feed, state)
                     continue
-                
-                points_locator = page.locator("#WocaPoints")
-
-                if points_locator.count() > 0 and points_locator.is_visible():
-                    points = int(points_locator.inner_text().strip())
-                else:
-                    print("#WocaPoints not present — probably returned to standard view")
-                    notify_ntfy("Wocabee Bot Finished", "Bot has stopped because it seems to have returned to standard view. The browser will now close.")
-                    notify_ntfy("Wocabee Bot Final Report", f"Final points: {original_points + addon_points} (original: {original_points}, addon: {addon_points}) | Total time running: {int(time.time() - one_time)} seconds")
-                    exit(0)
-
-                # inside your loop, after updating `points`:
-                while points >= last_milestone + milestone_reminder:
-                    last_milestone += milestone_reminder
-                    print(f"Milestone reached: {points} points (original: {original_points}, addon: {addon_points})")
-                    notify_ntfy(
-                        "Wocabee Bot Progress Report",
-                        f"Current points: {points} (original: {original_points}, target: {original_points + addon_points})"
-                    )
-                
-                if points >= original_points + addon_points and addon_points != -1:
-                    print(f"Target reached: {points} points (original: {original_points}, addon: {addon_points}), stopping bot")
-                    notify_ntfy("Wocabee Bot reached the target", f"Wocabee Bot has reached the target of {points} points (original: {original_points}, addon: {addon_points}), stopping and saving!")
+
+                if state["points"] is None:
+                    report_standard_view(tracker)
+                    return True
+
+                report_milestones(tracker)
+
+                if target_reached(tracker):
                     StopBot = True
-                
+
                 if StopBot:
-                    page.wait_for_selector("#backBtn", timeout=5000)
-                    page.click("#backBtn")
+                    await page.locator("#backBtn").wait_for(timeout=5000)
+                    await page.click("#backBtn")
                     try:
-                        page.wait_for_selector("#standardView", state="visible", timeout=15000)
+                        await page.locator("#standardView").wait_for(state="visible", timeout=15000)
                         notify_ntfy("Wocabee Bot Finished", "Bot has stopped and returned to standard view. The browser will now safely close.")
-                        break
                     except Exception as e:
                         notify_ntfy("Wocabee Bot Error", f"Failed to load #standardView after clicking back. Exiting anyway. Error: {e}")
-                        break
-                
-                # 3. TRANSLATE INPUT
-                question_span = page.locator("#q_word")
-                if question_span.count() > 0 and question_span.is_visible():
-                    word_raw = question_span.inner_text()
-                    word = normalize(word_raw)
-                    if word in PLACEHOLDER_WORDS:
-                        time.sleep(0.1)
-                        continue
-                    print("TranslateWord answered:", word_raw, " | Current points:", points)
-                    answer = get_answer_auto_update(word)
-                    if answer:
-                        answer_input = page.locator("#translateWordAnswer")
-                        answer_input.click()
-                        page.keyboard.type(answer, delay=random.randint(60, 120))
-                        page.keyboard.press("Enter")
-                    page.wait_for_timeout(400)
+                    return True
+
+                if active == "translateWord" and await acall_handler(active, ahandle_translate_word, page, state):
+                    next_state = await await_after_handler(page, feed, state)
                     continue
 
-                time.sleep(0.1)
-                
-                
+                next_state = await await_idle(feed)
 
             except Exception as e_inner:
                 tb = traceback.format_exc()
                 print("Runtime error:", tb)
                 notify_ntfy("Wocabee Bot Runtime Error", tb)
-                time.sleep(1)
+                next_state = None
+                await asyncio.sleep(1)
+
+    except Exception:
+        report_startup_error()
+        return False
+
+# ---------------- Benchmarks ----------------
+
+def bench_normalize(rounds=200):
+    """
+    Compare the old uncached normalize() with the cached ASCII fast path on
+    the loaded wordlist, the way a session calls it: every table entry and
+    a handful of choice texts, over and over.
+    """
+    def reference(text: str) -> str:
+        return strip_accents(text.strip().lower())
+
+    words = [w for pair in WORD_TABLE.items() for w in pair]
+    # choice buttons and questions come from the page with odd casing/padding
+    words += [f" {w.upper()} " for w in words[:50]]
+    ascii_share = sum(w.isascii() for w in words) / max(len(words), 1)
+    print(f"normalize() benchmark: {len(words)} strings ({ascii_share:.0%} ASCII), {rounds} rounds")
+
+    def run(func):
+        start = time.perf_counter()
+        for _ in range(rounds):
+            for w in words:
+                func(w)
+        return (time.perf_counter() - start) / (rounds * len(words)) * 1e9
+
+    normalize.cache_clear()
+    results = {
+        "reference (NFD every call)": run(reference),
+        "ASCII fast path, no cache": run(normalize.__wrapped__),
+        "cached + ASCII fast path": run(normalize),
+    }
+    baseline = results["reference (NFD every call)"]
+    for name, ns in results.items():
+        print(f"  {name:<28} {ns:8.1f} ns/call  x{baseline / ns:.1f}")
+    print("  cache:", normalize.cache_info())
+
+# ---------------- Library / CLI ----------------
+
+LOADED_SETTINGS = None  # (config file, url, use_async) of the first Solver.load()
+
+class Solver:
+    """
+    The bot as a library. load() reads the config and the data files,
+    attach() hands it a Playwright page and run() solves until the points
+    target or the standard view is reached. Without attach() the tab is
+    found over CDP, the same as running solver.py.
+
+    Settings and data stores are module-wide, so every Solver in a process
+    must load the same config; a different one raises RuntimeError.
+
+        solver = Solver(url="wocabee.app/app").load()
+        solver.attach(page).run()            # sync_api page
+        await solver.attach(page).arun()     # async_api page
+    """
+
+    def __init__(self, config_file=CONFIG_FILE, url=None, use_async=False):
+        self.config_file = config_file
+        self.url = url
+        self.use_async = use_async
+        self.page = None
+        self.loaded = False
+
+    def load(self):
+        global LOADED_SETTINGS
+        if not self.loaded:
+            settings = (os.path.abspath(self.config_file), self.url, bool(self.use_async))
+            if LOADED_SETTINGS is not None and LOADED_SETTINGS != settings:
+                raise RuntimeError(f"Solver already loaded with {LOADED_SETTINGS}, can't load {settings} in the same process")
+            configure(self.config_file, self.url, self.use_async)
+            load_data()
+            LOADED_SETTINGS = settings
+            self.loaded = True
+        return self
+
+    def attach(self, page):
+        self.page = page
+        return self
+
+    def warm_up(self, page=None) -> int:
+        """Learn the package's word listing (sync_api page), never raises."""
+        self.load()
+        try:
+            return warm_up_vocabulary(page or self.page)
+        except Exception as e:
+            print("Vocabulary warm-up failed:", e)
+            return 0
+
+    def run(self) -> bool:
+        self.load()
+        if ASYNC_ENGINE:
+            if self.page is None:
+                return asyncio.run(self.arun())
+            # a sync_api page can't be driven from asyncio, say so instead of switching silently
+            print("async_engine is set, but the attached page is a sync_api page: running the sync engine")
+        return run_sync(self.page)
+
+    async def arun(self) -> bool:
+        self.load()
+        return await run_async(self.page)
+
+def main(argv=None):
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--url", help="Target URL")
+    parser.add_argument("--async", dest="use_async", action="store_true", help="Run the asyncio solver engine")
+    parser.add_argument("--bench-normalize", action="store_true", help="Benchmark normalize() on the wordlist and exit")
+    args = parser.parse_args(argv)
+
+    try:
+        solver = Solver(url=args.url, use_async=args.use_async).load()
+    except ValueError as e:
+        print("Error:", e)
+        exit(1)
+
+    if args.bench_normalize:
+        bench_normalize()
+    else:
+        solver.run()
 
-    except Exception as e_outer:
-        tb = traceback.format_exc()
-        print("Startup/Connection error:", tb)
-        notify_ntfy("Wocabee Bot Startup Error", tb)
\ No newline at end of file
+if __name__ == "__main__":
+    main()
@@ -1,9 +1,11 @@
 #!/usr/bin/env python3
 import os
 import sys
+import json
+import time
 import toml
 from playwright.sync_api import sync_playwright
-import subprocess
+from solver import Solver
 
 CONFIG_FILE = "config.toml"
 
@@ -14,6 +16,65 @@ def load_config(path=CONFIG_FILE):
     return toml.load(path)
 
 
+# Defaults for the headless request blocking. The picture and audio exercises
+# only read src attributes, so their files can be blocked too.
+BLOCK_RESOURCE_TYPES = ["image", "media", "font"]
+BLOCK_URL_PATTERNS = [
+    "*google-analytics.com*",
+    "*googletagmanager.com*",
+    "*doubleclick.net*",
+    "*facebook.net*",
+    "*hotjar.com*",
+]
+# Chrome's URL blocklist knows no resource types, they're blocked by extension
+RESOURCE_TYPE_PATTERNS = {
+    "image": ["*.png*", "*.jpg*", "*.jpeg*", "*.gif*", "*.webp*", "*.svg*", "*.ico*"],
+    "media": ["*.mp3*", "*.ogg*", "*.wav*", "*.mp4*", "*.webm*"],
+    "font": ["*.woff*", "*.ttf*", "*.otf*"],
+}
+
+# Every startup step waits for the one element that proves it worked
+STEP_TIMEOUT_MS = 15000
+PRACTICE_SELECTOR = "#WocaPoints"
+
+
+def blocked_url_patterns(block_types, block_patterns):
+    """URL patterns for Chrome's blocklist, resource types become extensions."""
+    patterns = []
+    for resource_type in block_types:
+        patterns.extend(RESOURCE_TYPE_PATTERNS.get(resource_type, []))
+    patterns.extend(block_patterns)
+    return list(dict.fromkeys(patterns))
+
+
+def install_request_blocking(context, patterns):
+    """
+    Block the URL patterns (* matches anything) on every page of the context
+    through CDP Network.setBlockedURLs. Unlike context.route() this doesn't
+    turn off the HTTP cache or hold each request until Python answers it.
+    Returns a dict with the blocked count.
+    """
+    stats = {"blocked": 0}
+
+    def on_failed(event):
+        if event.get("blockedReason") == "inspector":
+            stats["blocked"] += 1
+
+    def block(page):
+        try:
+            session = context.new_cdp_session(page)
+            session.on("Network.loadingFailed", on_failed)
+            session.send("Network.enable")
+            session.send("Network.setBlockedURLs", {"urls": patterns})
+        except Exception as e:
+            print("Request blocking unavailable:", e)
+
+    for page in context.pages:
+        block(page)
+    context.on("page", block)
+    return stats
+
+
 def main():
     cfg = load_config()
     headless = bool(cfg.get("headless", False))
@@ -23,15 +84,28 @@ def main():
     class_index = int(cfg.get("class_index", 0))
     package_index = int(cfg.get("package_index", 0))
     urlbase = cfg.get("urlbase", "https://wocabee.app/app")
+    # cookies + localStorage of a logged in session, empty turns reuse off
+    storage_state_file = str(cfg.get("storage_state_file", "")).strip()
+    # headless runs skip what nobody looks at, block_requests = false turns it off
+    block_requests = bool(cfg.get("block_requests", True))
+    block_resource_types = cfg.get("block_resource_types", BLOCK_RESOURCE_TYPES)
+    block_url_patterns = cfg.get("block_url_patterns", BLOCK_URL_PATTERNS)
 
     if not username or not password:
         print("username or password missing in config.toml")
         sys.exit(1)
 
+    # load the solver up front, a broken config or wordlist shows up before the login
+    try:
+        solver = Solver(CONFIG_FILE).load()
+    except ValueError as e:
+        print("Error:", e)
+        sys.exit(1)
+
     def enable_double_points(page):
         try:
             # Wait for wrapper instead of input visibility
-            page.wait_for_selector("#toggleWrapper", timeout=5000)
+            page.locator("#toggleWrapper").wait_for(timeout=5000)
 
             toggle = page.locator("#levelToggle")
 
@@ -52,7 +126,7 @@ def main():
             return False
     
     def click_package_by_index(page, index: int):
-        page.wait_for_selector("tr.pTableRow", timeout=10000)
+        page.locator("tr.pTableRow").first.wait_for(timeout=10000)
 
         packages = page.locator("tr.pTableRow")
 
@@ -65,31 +139,31 @@ def main():
 
         # Click practice button inside that row
         packages.nth(index).locator("a .btn-primary").click()
-
-        page.wait_for_load_state("networkidle")
         return True
     
     def click_class_by_index(page, index: int):
         try:
             # Wait for the class list to appear
-            page.wait_for_selector("#listOfClasses a", timeout=10000)
+            page.locator("#listOfClasses a").first.wait_for(timeout=10000)
 
-            # Get all class links
-            class_links = page.query_selector_all("#listOfClasses a")
+            class_links = page.locator("#listOfClasses a")
+            count = class_links.count()
 
-            if not class_links:
+            if not count:
                 print("No classes found.")
-                return
+                return False
 
-            if index < 0 or index >= len(class_links):
-                print(f"Index {index} out of range. Found {len(class_links)} classes.")
-                return
+            if index < 0 or index >= count:
+                print(f"Index {index} out of range. Found {count} classes.")
+                return False
 
             print(f"Clicking class at index {index}")
-            class_links[index].click()
+            class_links.nth(index).click()
+            return True
 
         except Exception as e:
             print("Error clicking class:", e)
+            return False
     
     p = sync_playwright().start()
 
@@ -97,64 +171,173 @@ def main():
         headless=headless,
         args=[
             "--no-sandbox",
-            "--remote-debugging-port=9222"
         ]
     )
 
-    context = browser.new_context()
-    page = context.new_page()
-
     # navigate to target
     if not urlbase.startswith(("http://", "https://")):
         target = "https://" + urlbase
     else:
         target = urlbase
 
-    page.goto(target)
-    try:
-        page.wait_for_load_state("domcontentloaded", timeout=5000)
-    except Exception:
-        pass
-    print("Opened page:", page.url)
+    block_stats = []
 
-    # fill login fields
-    try:
-        page.wait_for_selector("#login", timeout=5000)
-        page.fill("#login", username)
-        print("Filled #login")
-    except Exception:
-        print("Login input (#login) not found")
+    def new_context(**kwargs):
+        context = browser.new_context(**kwargs)
+        if headless and block_requests:
+            block_stats.append(install_request_blocking(context, blocked_url_patterns(block_resource_types, block_url_patterns)))
+        return context
 
-    try:
-        page.wait_for_selector("#password", timeout=5000)
-        page.fill("#password", password)
-        print("Filled #password")
-        # submit (press Enter)
-        page.press("#password", "Enter")
-        print("Submitted credentials")
-    except Exception:
-        print("Password input (#password) not found")
-    
-            # Wait for navigation after login
-    page.wait_for_load_state("networkidle")
+    def open_target(context):
+        page = context.new_page()
+        # the next step waits for its own selector, no need for the load event
+        page.goto(target, wait_until="domcontentloaded")
+        print("Opened page:", page.url)
+        return page
 
-    click_class_by_index(page, class_index)
-    
-    click_package_by_index(page, package_index)
-    
-    if double_points:
-        enable_double_points(page)
-    
-    solver_proc = subprocess.Popen(["python", "solver.py"])
+    def is_logged_in(page):
+        # the class list is only there behind the login, the form only in front of it
+        try:
+            page.locator("#listOfClasses a, #login").first.wait_for(timeout=10000)
+        except Exception:
+            return False
+        return page.locator("#listOfClasses a").count() > 0
+
+    def login(page):
+        # fill login fields
+        try:
+            page.locator("#login").wait_for(timeout=5000)
+            page.fill("#login", username)
+            print("Filled #login")
+        except Exception:
+            print("Login input (#login) not found")
+
+        try:
+            page.locator("#password").wait_for(timeout=5000)
+            page.fill("#password", password)
+            print("Filled #password")
+            # submit (press Enter)
+            page.press("#password", "Enter")
+            print("Submitted credentials")
+        except Exception:
+            print("Password input (#password) not found")
+
+    def save_storage_state(context):
+        try:
+            state = context.storage_state()
+            # session cookies, keep them readable by the owner only
+            tmp_file = storage_state_file + ".tmp"
+            fd = os.open(tmp_file, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o600)
+            with os.fdopen(fd, "w", encoding="utf-8") as f:
+                json.dump(state, f)
+            os.replace(tmp_file, storage_state_file)
+            print("Saved session to", storage_state_file)
+        except Exception as e:
+            print("Failed to save session:", e)
+
+    context = None
+    page = None
 
+    def step_done(name, start):
+        print(f"Startup step '{name}' took {(time.perf_counter() - start) * 1000:.0f} ms")
+
+    def wait_step(name, selector, start):
+        try:
+            page.locator(selector).first.wait_for(timeout=STEP_TIMEOUT_MS)
+        except Exception as e:
+            print(f"Startup step '{name}' failed, {selector} did not show up: {e}")
+            return False
+        step_done(name, start)
+        return True
+
+    # Each step returns the name of the next one, "failed" stops the startup
+    def step_session():
+        nonlocal context, page
+        start = time.perf_counter()
+        if storage_state_file and os.path.exists(storage_state_file):
+            try:
+                context = new_context(storage_state=storage_state_file)
+                page = open_target(context)
+                if is_logged_in(page):
+                    print("Reused saved session from", storage_state_file)
+                    step_done("session", start)
+                    return "class"
+                print("Saved session expired, logging in again")
+            except Exception as e:
+                print("Could not reuse saved session:", e)
+            if context:
+                context.close()
+
+        context = new_context()
+        page = open_target(context)
+        step_done("session", start)
+        return "login"
+
+    def step_login():
+        start = time.perf_counter()
+        login(page)
+        if not wait_step("login", "#listOfClasses a", start):
+            return "failed"
+        if storage_state_file:
+            save_storage_state(context)
+        return "class"
+
+    def step_class():
+        start = time.perf_counter()
+        if not click_class_by_index(page, class_index):
+            return "failed"
+        return "package" if wait_step("class", "tr.pTableRow", start) else "failed"
+
+    def step_package():
+        start = time.perf_counter()
+        if not click_package_by_index(page, package_index):
+            return "failed"
+        return "practice" if wait_step("package", PRACTICE_SELECTOR, start) else "failed"
+
+    def step_practice():
+        start = time.perf_counter()
+        # learn the package's words before the first exercise shows up
+        solver.warm_up(page)
+        if double_points:
+            enable_double_points(page)
+        step_done("practice", start)
+        return "solve"
+
+    steps = {
+        "session": step_session,
+        "login": step_login,
+        "class": step_class,
+        "package": step_package,
+        "practice": step_practice,
+    }
+
+    state = "session"
     try:
-        solver_proc.wait()   # Wait until solver exits
+        startup_time = time.perf_counter()
+        while state in steps:
+            state = steps[state]()
+
+        # the solver works on this page directly, no second process or CDP reconnect
+        if state == "solve":
+            print(f"Startup finished in {(time.perf_counter() - startup_time) * 1000:.0f} ms")
+            solver.attach(page).run()
     finally:
-        print("Solver exited. Cleaning up...")
-
+        if state == "solve":
+            print("Solver exited. Cleaning up...")
+            # the site may have refreshed the session cookies while we ran
+            if storage_state_file:
+                save_storage_state(context)
+        else:
+            print("Startup failed, not starting the solver. Cleaning up...")
+
+        if block_stats:
+            print("Blocked requests:", sum(stats["blocked"] for stats in block_stats))
         browser.close()
         p.stop()
 
+    if state != "solve":
+        sys.exit(1)
+
 
 if __name__ == "__main__":
     main()
\ No newline at end of file